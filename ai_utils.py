@@ -1,20 +1,38 @@
+import atexit
+import functools
+import hashlib
+import json
 import logging
-import math
+import os
 import re
+import string
+import threading
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 import config
+import file_utils
 
-# --- Conditional Imports ---
-if config.AI_PROVIDER == 'openai':
-    import openai
-    import tiktoken
-elif config.AI_PROVIDER == 'gemini':
-    # This is the correct import for the 'google-genai' package
-    from google import genai
-else:
+# --- Provider Check ---
+# The provider SDKs (openai/tiktoken or google-genai) are imported on first use
+# inside the functions below, so importing this module stays cheap.
+if config.AI_PROVIDER not in ('openai', 'gemini'):
     raise ValueError(f"Invalid AI_PROVIDER '{config.AI_PROVIDER}' in config. Please choose 'openai' or 'gemini'.")
 
 # --- Constants ---
 CONTEXT_SAFETY_MARGIN = 500
+OPENAI_RATE_LIMIT_RETRIES = 3
+PARALLEL_ENCODE_MIN_CHARS = 200000 # Transcripts at least this long are tokenized in parallel pieces
+
+# --- Shared Clients ---
+_openai_client = None
+_openai_client_lock = threading.Lock()
+_openai_rate_limit_lock = threading.Lock()
+_openai_next_request_time = 0.0
+_gemini_client = None
+_gemini_client_lock = threading.Lock()
+# Video workers and their chunk fan-out share this, so MAX_WORKERS x *_MAX_CONCURRENCY can't flood the API.
+_ai_request_slots = threading.BoundedSemaphore(config.AI_MAX_REQUESTS_IN_FLIGHT)
 
 
 # ==============================================================================
@@ -70,73 +88,203 @@ def parse_ai_response(raw_response):
 
     return {"metadata": metadata, "summary": summary_text}
 
+# ==============================================================================
+# --- PROMPT FILLING ---
+# ==============================================================================
+
+@functools.lru_cache(maxsize=16)
+def _compile_prompt(template):
+    """
+    Parses a prompt template once and returns fill(input_text, video_title).
+    Equivalent to template.format(input_text=..., video_title=...) but skips
+    re-parsing the template for every chunk.
+    """
+    parts = [(literal, field) for literal, field, _spec, _conv in string.Formatter().parse(template)]
+
+    def fill(input_text, video_title):
+        values = {"input_text": input_text, "video_title": video_title}
+        return "".join(literal + (values[field] if field is not None else "") for literal, field in parts)
+
+    return fill
+
 # ==============================================================================
 # --- OPENAI SPECIFIC FUNCTIONS (Unchanged) ---
 # ==============================================================================
-def _count_openai_tokens(text, model_name=config.OPENAI_MODEL_NAME):
-    if not text: return 0
+@functools.lru_cache(maxsize=8)
+def _get_encoding(model_name):
+    """Returns the tiktoken encoding for a model, cached so the lookup only happens once per model."""
+    import tiktoken
     try:
-        encoding = tiktoken.encoding_for_model(model_name)
+        return tiktoken.encoding_for_model(model_name)
     except KeyError:
-        logging.debug(f"Could not find tiktoken encoding for model '{model_name}'. Using 'cl100k_base'.")
-        encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(text))
+        logging.debug("Could not find tiktoken encoding for model '%s'. Using 'cl100k_base'.", model_name)
+        return tiktoken.get_encoding("cl100k_base")
 
-def _split_text_into_chunks_openai(text, max_tokens_per_chunk, model_name=config.OPENAI_MODEL_NAME):
-    chunks = []
-    try:
-        encoding = tiktoken.encoding_for_model(model_name)
-        tokens = encoding.encode(text)
-        current_chunk_start_index = 0
-        while current_chunk_start_index < len(tokens):
-            chunk_end_index = min(current_chunk_start_index + max_tokens_per_chunk, len(tokens))
-            chunk_tokens = tokens[current_chunk_start_index:chunk_end_index]
-            chunks.append(encoding.decode(chunk_tokens))
-            current_chunk_start_index = chunk_end_index
-        logging.info(f"Split text into {len(chunks)} chunks for OpenAI.")
-        return chunks
-    except Exception as e:
-         logging.error(f"Failed to split text into chunks for OpenAI: {e}. Returning text as a single chunk.")
-         return [text]
+def _count_openai_tokens(text, model_name=config.OPENAI_MODEL_NAME):
+    if not text: return 0
+    return len(_get_encoding(model_name).encode(text))
+
+def _token_upper_bound(text):
+    """Cheap upper bound on the token count: every BPE token covers at least one UTF-8 byte."""
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+@functools.lru_cache(maxsize=16)
+def _prompt_overhead_tokens(template, model_name=config.OPENAI_MODEL_NAME):
+    """Token count of a prompt template with empty placeholders. Cached since templates are reused for every video."""
+    return _count_openai_tokens(_compile_prompt(template)("", ""), model_name)
 
+@functools.lru_cache(maxsize=8)
+def _encode_transcript(text, model_name=config.OPENAI_MODEL_NAME):
+    """
+    Tokenizes a transcript once; summary and atomic notes for the same video share the result.
+    Long transcripts are cut into pieces and encoded with encode_batch, which runs the
+    pieces on tiktoken's native threads. Each cut sits right before a space that follows
+    a non-space character: tiktoken's pre-tokenizer always starts a new word there, so the
+    pieces give exactly the tokens of a single encode.
+    Tokens are kept in a compact array('I') (4 bytes each instead of a Python int object
+    per token), since up to 8 encoded transcripts stay cached.
+    """
+    encoding = _get_encoding(model_name)
+    if len(text) < PARALLEL_ENCODE_MIN_CHARS:
+        return array("I", encoding.encode(text))
+    pieces = []
+    start = 0
+    while start < len(text):
+        end = start + PARALLEL_ENCODE_MIN_CHARS // 4
+        cut = text.find(" ", end)
+        while cut != -1 and text[cut - 1].isspace():
+            cut = text.find(" ", cut + 1)
+        end = len(text) if cut == -1 else cut
+        pieces.append(text[start:end])
+        start = end
+    tokens = array("I")
+    for piece_tokens in encoding.encode_batch(pieces, num_threads=os.cpu_count() or 1):
+        tokens.extend(piece_tokens)
+    return tokens
+
+def _iter_token_chunks_openai(tokens, max_tokens_per_chunk, model_name=config.OPENAI_MODEL_NAME):
+    """Yields decoded text chunks of at most max_tokens_per_chunk tokens, one at a time, from an encoded token array."""
+    encoding = _get_encoding(model_name)
+    for start in range(0, len(tokens), max_tokens_per_chunk):
+        # Only the current slice is expanded to a list of ints for tiktoken.
+        yield encoding.decode(tokens[start:start + max_tokens_per_chunk].tolist())
+
+def _get_openai_client():
+    """Returns the shared OpenAI client, creating it on first use so its connection pool is reused across calls."""
+    global _openai_client
+    import openai
+    with _openai_client_lock:
+        if _openai_client is None:
+            _openai_client = openai.OpenAI(api_key=config.OPENAI_API_KEY)
+            atexit.register(_openai_client.close)
+        return _openai_client
+
+def _wait_for_openai_rate_limit():
+    """Spaces out request starts so concurrent callers stay under OPENAI_REQUESTS_PER_MINUTE."""
+    global _openai_next_request_time
+    if config.OPENAI_REQUESTS_PER_MINUTE <= 0:
+        return
+    interval = 60.0 / config.OPENAI_REQUESTS_PER_MINUTE
+    with _openai_rate_limit_lock:
+        now = time.monotonic()
+        wait = _openai_next_request_time - now
+        _openai_next_request_time = max(now, _openai_next_request_time) + interval
+    if wait > 0:
+        time.sleep(wait)
+
+# Prompt caching: OpenAI and Gemini reuse a cached prompt prefix (1024+ tokens) when it is
+# identical to a recent request. Prompt templates therefore keep all per-video placeholders
+# ({video_title}, {input_text}) at the very end under INPUT, so the instructions (and the
+# taxonomy in the final prompt) form a prefix shared by every chunk and every video.
 def _call_openai_api(prompt_filled, purpose="summarization"):
+    text, _ = _call_openai_api_with_usage(prompt_filled, purpose)
+    return text
+
+def _call_openai_api_with_usage(prompt_filled, purpose="summarization"):
+    """
+    Like _call_openai_api, but returns (text, completion_tokens) so callers can budget
+    the response's size without re-encoding it. Returns (None, 0) on failure.
+    """
+    import openai
     if not config.OPENAI_API_KEY:
         logging.error("OpenAI API Key missing.")
-        return None
-    try:
-        client = openai.OpenAI(api_key=config.OPENAI_API_KEY)
-        response = client.chat.completions.create(
-            model=config.OPENAI_MODEL_NAME,
-            messages=[{"role": "user", "content": prompt_filled}],
-            temperature=config.OPENAI_TEMPERATURE,
-            max_tokens=config.OPENAI_MAX_TOKENS
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        logging.error(f"OpenAI API call failed for {purpose}: {e}", exc_info=True)
-        return None
+        return None, 0
+    for attempt in range(OPENAI_RATE_LIMIT_RETRIES + 1):
+        try:
+            client = _get_openai_client()
+            with _ai_request_slots:
+                _wait_for_openai_rate_limit()
+                response = client.chat.completions.create(
+                    model=config.OPENAI_MODEL_NAME,
+                    messages=[{"role": "user", "content": prompt_filled}],
+                    temperature=config.OPENAI_TEMPERATURE,
+                    max_tokens=config.OPENAI_MAX_TOKENS
+                )
+            completion_tokens = response.usage.completion_tokens if response.usage else 0
+            return response.choices[0].message.content.strip(), completion_tokens
+        except openai.RateLimitError as e:
+            if attempt == OPENAI_RATE_LIMIT_RETRIES:
+                logging.error(f"OpenAI API call for {purpose} still rate-limited after {attempt + 1} attempts: {e}")
+                return None, 0
+            delay = 2 ** attempt
+            logging.warning(f"OpenAI rate limit hit for {purpose}. Retrying in {delay}s...")
+            time.sleep(delay)
+        except Exception as e:
+            logging.error(f"OpenAI API call failed for {purpose}: {e}", exc_info=True)
+            return None, 0
+
+def _call_concurrently(call, prompts, max_in_flight, purpose):
+    """
+    Runs call(prompt, purpose_label) for each prompt in parallel threads, with at most max_in_flight running.
+    `prompts` may be a generator; it is consumed lazily so only in-flight prompts are held in memory.
+    Returns the results in the same order as the prompts.
+    """
+    results = {}
+    pending = {}
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for i, prompt in enumerate(prompts):
+            if len(pending) >= max_in_flight:
+                # Refill as soon as any request finishes, not just the oldest one.
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+            pending[executor.submit(call, prompt, f"{purpose} {i + 1}")] = i
+        for future in as_completed(pending):
+            results[pending[future]] = future.result()
+    return [results[i] for i in range(len(results))]
+
+def _call_openai_api_concurrently(prompts, purpose="chunk"):
+    """
+    Sends prompts to OpenAI with at most OPENAI_MAX_CONCURRENCY in flight.
+    Returns a list of (text, completion_tokens) in the same order as the prompts; failed calls are (None, 0).
+    """
+    return _call_concurrently(_call_openai_api_with_usage, prompts, config.OPENAI_MAX_CONCURRENCY, purpose)
 
 # ==============================================================================
 # --- GEMINI SPECIFIC FUNCTIONS (Corrected to use 'google-genai') ---
 # ==============================================================================
 
 def _get_gemini_client():
-    """Initializes and returns the Gemini client."""
+    """Returns the shared Gemini client, creating it on first use so it is reused across videos."""
+    global _gemini_client
     if not config.GEMINI_API_KEY:
         logging.error("Gemini API Key missing. Cannot configure client.")
         return None
-    try:
-        # Using genai.Client() from the correct 'google-genai' library
-        client = genai.Client(api_key=config.GEMINI_API_KEY)
-        return client
-    except Exception as e:
-        logging.error(f"Failed to configure Gemini client: {e}", exc_info=True)
-        return None
+    with _gemini_client_lock:
+        if _gemini_client is None:
+            try:
+                # Using genai.Client() from the correct 'google-genai' library
+                from google import genai
+                _gemini_client = genai.Client(api_key=config.GEMINI_API_KEY)
+            except Exception as e:
+                logging.error(f"Failed to configure Gemini client: {e}", exc_info=True)
+                return None
+        return _gemini_client
 
 def _call_gemini_api(prompt_filled, client, purpose="summarization"):
     """Makes a single API call to Gemini using the correct client method."""
     try:
-        logging.debug(f"Sending prompt to {config.GEMINI_MODEL_NAME} for {purpose}.")
+        logging.debug("Sending prompt to %s for %s.", config.GEMINI_MODEL_NAME, purpose)
         
         # The configuration is now part of the 'generate_content' call directly
         generation_config = {
@@ -145,17 +293,67 @@ def _call_gemini_api(prompt_filled, client, purpose="summarization"):
         }
         
         # Use the client.models.generate_content method as per the docs
-        response = client.models.generate_content(
-            model=f"models/{config.GEMINI_MODEL_NAME}",
-            contents=prompt_filled,
-            config=generation_config
-        )
+        with _ai_request_slots:
+            response = client.models.generate_content(
+                model=f"models/{config.GEMINI_MODEL_NAME}",
+                contents=prompt_filled,
+                config=generation_config
+            )
         return response.text.strip()
     except Exception as e:
         logging.error(f"Gemini API call failed for {purpose}: {e}", exc_info=True)
         print(f"Error during Gemini API call: {e}")
         return None
 
+def _call_gemini_api_concurrently(prompts, client, purpose="chunk"):
+    """Sends prompts to Gemini with at most GEMINI_MAX_CONCURRENCY in flight; results keep the prompts' order."""
+    call = lambda prompt, label: _call_gemini_api(prompt, client, label)
+    return _call_concurrently(call, prompts, config.GEMINI_MAX_CONCURRENCY, purpose)
+
+def _iter_text_chunks(text, max_chars):
+    """Yields pieces of at most max_chars characters, breaking at the last whitespace where possible."""
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            split_at = text.rfind(" ", start, end)
+            if split_at > start:
+                end = split_at
+        yield text[start:end]
+        start = end
+
+# ==============================================================================
+# --- SUMMARY CACHE ---
+# ==============================================================================
+
+def _summary_cache_key(transcript, chunk_prompt_template, final_prompt_template, video_title):
+    """Content hash of everything that determines a summary: provider, model, prompts, title and transcript."""
+    model_name = config.OPENAI_MODEL_NAME if config.AI_PROVIDER == 'openai' else config.GEMINI_MODEL_NAME
+    parts = [config.AI_PROVIDER, model_name, chunk_prompt_template, final_prompt_template, video_title, transcript]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+def _read_cached_summary(cache_key):
+    """Returns the cached {"metadata", "summary"} result for a key, or None on a miss."""
+    cache_path = config.SUMMARY_CACHE_DIR / f"{cache_key}.json"
+    try:
+        return json.loads(cache_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable summary cache entry {cache_path.name}: {e}")
+        return None
+
+def _write_cached_summary(cache_key, result):
+    """Stores a summary result; written to a temp file and renamed so readers never see a partial entry."""
+    cache_path = config.SUMMARY_CACHE_DIR / f"{cache_key}.json"
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        file_utils.ensure_dir(config.SUMMARY_CACHE_DIR)
+        tmp_path.write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logging.warning(f"Could not write summary cache entry {cache_path.name}: {e}")
+
 # ==============================================================================
 # --- MAIN SUMMARIZATION ORCHESTRATOR ---
 # ==============================================================================
@@ -166,56 +364,91 @@ def summarize_transcript(transcript, chunk_prompt_template, final_prompt_templat
         logging.warning("Summarize called with empty or missing transcript.")
         return None
 
+    cache_key = _summary_cache_key(transcript, chunk_prompt_template, final_prompt_template, video_title)
+    cached = _read_cached_summary(cache_key)
+    if cached is not None:
+        logging.info(f"Using cached summary for '{video_title}' (cache key {cache_key[:12]}).")
+        return cached
+
     logging.info(f"Starting summarization process using AI Provider: {config.AI_PROVIDER.upper()}")
 
     if config.AI_PROVIDER == 'openai':
-        return _summarize_with_openai(transcript, chunk_prompt_template, final_prompt_template, video_title)
+        result = _summarize_with_openai(transcript, chunk_prompt_template, final_prompt_template, video_title)
     elif config.AI_PROVIDER == 'gemini':
-        return _summarize_with_gemini(transcript, chunk_prompt_template, final_prompt_template, video_title)
+        result = _summarize_with_gemini(transcript, chunk_prompt_template, final_prompt_template, video_title)
     else:
         logging.error(f"Unsupported AI provider '{config.AI_PROVIDER}' configured.")
         return None
 
+    if result and result.get("summary"):
+        _write_cached_summary(cache_key, result)
+    return result
+
 def _summarize_with_openai(transcript, chunk_prompt_template, final_prompt_template, video_title):
     """Handles the full summarization workflow for OpenAI, including chunking."""
-    prompt_tokens = _count_openai_tokens(final_prompt_template.format(input_text="", video_title=""))
+    prompt_tokens = _prompt_overhead_tokens(final_prompt_template)
     safe_context_threshold = config.OPENAI_CONTEXT_LIMIT - prompt_tokens - config.OPENAI_MAX_TOKENS - CONTEXT_SAFETY_MARGIN
-    transcript_tokens = _count_openai_tokens(transcript)
+    # Skip the exact encode when even the byte-count upper bound fits the context.
+    tokens = None if _token_upper_bound(transcript) < safe_context_threshold else _encode_transcript(transcript)
 
-    if transcript_tokens < safe_context_threshold:
+    if tokens is None or len(tokens) < safe_context_threshold:
         print("Transcript fits in context. Using single-pass summarization (OpenAI)...")
-        prompt = final_prompt_template.format(input_text=transcript, video_title=video_title)
+        prompt = _compile_prompt(final_prompt_template)(transcript, video_title)
         raw = _call_openai_api(prompt, "single pass final summary")
         return parse_ai_response(raw) if raw else None
     else:
-        print(f"Transcript too long for single pass ({transcript_tokens} tokens). Chunking required (OpenAI)...")
-        chunk_prompt_tokens = _count_openai_tokens(chunk_prompt_template.format(input_text="", video_title=""))
+        print(f"Transcript too long for single pass ({len(tokens)} tokens). Chunking required (OpenAI)...")
+        chunk_prompt_tokens = _prompt_overhead_tokens(chunk_prompt_template)
+        # Each chunk fills the whole context window, so chunks can't be packed into shared requests;
+        # request overhead is hidden by sending them concurrently instead.
         max_tokens_per_chunk = config.OPENAI_CONTEXT_LIMIT - chunk_prompt_tokens - config.OPENAI_MAX_TOKENS - CONTEXT_SAFETY_MARGIN
         
         if max_tokens_per_chunk <= 0:
             logging.error("Cannot process with OpenAI: Chunk prompt is too large.")
             return None
 
-        chunks = _split_text_into_chunks_openai(transcript, max_tokens_per_chunk)
-        chunk_summaries = []
-        print(f"Processing {len(chunks)} chunks...")
+        num_chunks = (len(tokens) + max_tokens_per_chunk - 1) // max_tokens_per_chunk
+        print(f"Summarizing {num_chunks} chunks concurrently...")
+        fill_chunk_prompt = _compile_prompt(chunk_prompt_template)
+        prompts = (fill_chunk_prompt(chunk, video_title) for chunk in _iter_token_chunks_openai(tokens, max_tokens_per_chunk))
+        results = _call_openai_api_concurrently(prompts, "chunk summary")
 
-        for i, chunk in enumerate(chunks):
-            print(f"Summarizing chunk {i+1}/{len(chunks)}...")
-            prompt = chunk_prompt_template.format(input_text=chunk, video_title=video_title)
-            chunk_summary = _call_openai_api(prompt, f"chunk {i+1} summary")
-            if chunk_summary:
-                chunk_summaries.append(chunk_summary)
-            else:
+        for i, (chunk_summary, _) in enumerate(results):
+            if not chunk_summary:
                 logging.error(f"Failed to summarize OpenAI chunk {i+1}. Aborting.")
                 return None
         
-        if not chunk_summaries:
+        if not results:
+            return None
+
+        # Budget the final call from the reported completion sizes instead of re-encoding the combined text.
+        separator_tokens = _count_openai_tokens("\n\n---\n\n")
+        combined_tokens = sum(tokens for _, tokens in results) + separator_tokens * (len(results) - 1)
+        level = 0
+        while combined_tokens >= safe_context_threshold and len(results) > 1:
+            # Too long for one final call: merge neighbouring summaries pairwise until they fit.
+            level += 1
+            print(f"Combined chunk summaries (~{combined_tokens} tokens) too long; reducing {len(results)} summaries pairwise (level {level})...")
+            # With an odd count the last summary has no partner; it is carried to the next level unchanged.
+            unpaired = results[-1:] if len(results) % 2 else []
+            pair_prompts = (
+                fill_chunk_prompt("\n\n---\n\n".join(text for text, _ in results[i:i + 2]), video_title)
+                for i in range(0, len(results) - 1, 2)
+            )
+            merged = _call_openai_api_concurrently(pair_prompts, f"reduction level {level}")
+            if not merged or not all(text for text, _ in merged):
+                logging.error(f"Failed to merge chunk summaries at reduction level {level}. Aborting.")
+                return None
+            results = merged + unpaired
+            combined_tokens = sum(tokens for _, tokens in results) + separator_tokens * (len(results) - 1)
+        if combined_tokens >= safe_context_threshold:
+            logging.error(f"Combined chunk summaries (~{combined_tokens} tokens) exceed the final prompt's context budget ({safe_context_threshold}).")
             return None
 
         print("Combining chunk summaries (OpenAI)...")
+        chunk_summaries = [text for text, _ in results]
         combined_summaries_text = "\n\n---\n\n".join(chunk_summaries)
-        final_prompt = final_prompt_template.format(input_text=combined_summaries_text, video_title=video_title)
+        final_prompt = _compile_prompt(final_prompt_template)(combined_summaries_text, video_title)
         raw = _call_openai_api(final_prompt, "final summary combination")
         return parse_ai_response(raw) if raw else None
 
@@ -226,9 +459,39 @@ def _summarize_with_gemini(transcript, chunk_prompt_template, final_prompt_templ
         print("Error: Could not initialize Gemini client.")
         return None
     
-    print("Summarizing with Gemini (single pass)...")
-    prompt = final_prompt_template.format(input_text=transcript, video_title=video_title)
-    raw = _call_gemini_api(prompt, client, "final summary")
+    # There is no local Gemini tokenizer; the UTF-8 byte count is a safe upper bound on its tokens.
+    prompt_bound = _token_upper_bound(_compile_prompt(final_prompt_template)("", ""))
+    safe_context_threshold = config.GEMINI_CONTEXT_LIMIT - prompt_bound - config.GEMINI_MAX_TOKENS - CONTEXT_SAFETY_MARGIN
+    transcript_bound = _token_upper_bound(transcript)
+
+    if transcript_bound < safe_context_threshold:
+        print("Summarizing with Gemini (single pass)...")
+        prompt = _compile_prompt(final_prompt_template)(transcript, video_title)
+        raw = _call_gemini_api(prompt, client, "final summary")
+        return parse_ai_response(raw) if raw else None
+
+    print(f"Transcript too long for single pass (up to {transcript_bound} tokens). Chunking required (Gemini)...")
+    chunk_prompt_bound = _token_upper_bound(_compile_prompt(chunk_prompt_template)("", ""))
+    # Characters are budgeted at 4 UTF-8 bytes each so every chunk stays under the byte bound.
+    max_chars_per_chunk = (config.GEMINI_CONTEXT_LIMIT - chunk_prompt_bound - config.GEMINI_MAX_TOKENS - CONTEXT_SAFETY_MARGIN) // 4
+    if max_chars_per_chunk <= 0:
+        logging.error("Cannot process with Gemini: Chunk prompt is too large.")
+        return None
+
+    print("Summarizing chunks concurrently (Gemini)...")
+    fill_chunk_prompt = _compile_prompt(chunk_prompt_template)
+    prompts = (fill_chunk_prompt(chunk, video_title) for chunk in _iter_text_chunks(transcript, max_chars_per_chunk))
+    chunk_summaries = _call_gemini_api_concurrently(prompts, client, "chunk summary")
+
+    for i, chunk_summary in enumerate(chunk_summaries):
+        if not chunk_summary:
+            logging.error(f"Failed to summarize Gemini chunk {i+1}. Aborting.")
+            return None
+
+    print("Combining chunk summaries (Gemini)...")
+    combined_summaries_text = "\n\n---\n\n".join(chunk_summaries)
+    final_prompt = _compile_prompt(final_prompt_template)(combined_summaries_text, video_title)
+    raw = _call_gemini_api(final_prompt, client, "final summary combination")
     return parse_ai_response(raw) if raw else None
 
 # ==============================================================================
@@ -254,31 +517,31 @@ def generate_atomic_notes(transcript, atomic_prompt_template, video_title):
 
 def _generate_atomic_notes_openai(transcript, atomic_prompt_template, video_title):
     """Generates atomic notes using OpenAI, with chunking support for long transcripts."""
-    prompt_tokens = _count_openai_tokens(atomic_prompt_template.format(input_text="", video_title=""))
+    prompt_tokens = _prompt_overhead_tokens(atomic_prompt_template)
     safe_context_threshold = config.OPENAI_CONTEXT_LIMIT - prompt_tokens - config.OPENAI_MAX_TOKENS - CONTEXT_SAFETY_MARGIN
-    transcript_tokens = _count_openai_tokens(transcript)
+    # Skip the exact encode when even the byte-count upper bound fits the context.
+    tokens = None if _token_upper_bound(transcript) < safe_context_threshold else _encode_transcript(transcript)
 
-    if transcript_tokens < safe_context_threshold:
+    if tokens is None or len(tokens) < safe_context_threshold:
         print("Transcript fits in context. Generating atomic notes in single pass (OpenAI)...")
-        prompt = atomic_prompt_template.format(input_text=transcript, video_title=video_title)
+        prompt = _compile_prompt(atomic_prompt_template)(transcript, video_title)
         return _call_openai_api(prompt, "atomic notes single pass")
     else:
-        print(f"Transcript too long for single pass ({transcript_tokens} tokens). Chunking for atomic notes (OpenAI)...")
-        chunk_prompt_tokens = _count_openai_tokens(atomic_prompt_template.format(input_text="", video_title=""))
-        max_tokens_per_chunk = config.OPENAI_CONTEXT_LIMIT - chunk_prompt_tokens - config.OPENAI_MAX_TOKENS - CONTEXT_SAFETY_MARGIN
+        print(f"Transcript too long for single pass ({len(tokens)} tokens). Chunking for atomic notes (OpenAI)...")
+        # Same template for chunks, so the overhead is identical to the single-pass threshold.
+        max_tokens_per_chunk = safe_context_threshold
 
         if max_tokens_per_chunk <= 0:
             logging.error("Cannot generate atomic notes: prompt is too large for context window.")
             return None
 
-        chunks = _split_text_into_chunks_openai(transcript, max_tokens_per_chunk)
+        num_chunks = (len(tokens) + max_tokens_per_chunk - 1) // max_tokens_per_chunk
         all_notes_raw = []
-        print(f"Processing {len(chunks)} chunks for atomic notes...")
+        print(f"Extracting atomic notes from {num_chunks} chunks concurrently...")
+        fill_atomic_prompt = _compile_prompt(atomic_prompt_template)
+        prompts = (fill_atomic_prompt(chunk, video_title) for chunk in _iter_token_chunks_openai(tokens, max_tokens_per_chunk))
 
-        for i, chunk in enumerate(chunks):
-            print(f"Extracting atomic notes from chunk {i+1}/{len(chunks)}...")
-            prompt = atomic_prompt_template.format(input_text=chunk, video_title=video_title)
-            result = _call_openai_api(prompt, f"atomic notes chunk {i+1}")
+        for i, (result, _) in enumerate(_call_openai_api_concurrently(prompts, "atomic notes chunk")):
             if result:
                 all_notes_raw.append(result)
             else:
@@ -298,7 +561,7 @@ def _generate_atomic_notes_gemini(transcript, atomic_prompt_template, video_titl
         return None
 
     print("Generating atomic notes with Gemini (single pass)...")
-    prompt = atomic_prompt_template.format(input_text=transcript, video_title=video_title)
+    prompt = _compile_prompt(atomic_prompt_template)(transcript, video_title)
     return _call_gemini_api(prompt, client, "atomic notes")
 
 
@@ -366,12 +629,19 @@ def parse_atomic_notes(raw_response):
     return {"notes": notes, "source_index": source_index}
 
 
-# --- Prompt Loading Function (remains the same) ---
+# --- Prompt Loading Function ---
+@functools.lru_cache(maxsize=8)
+def _read_prompt_file(prompt_file_path):
+    """Reads a prompt file once per run. Errors propagate, so failed reads are not cached."""
+    with open(prompt_file_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    logging.info(f"Successfully loaded prompt file {prompt_file_path}")
+    return content
+
 def load_prompt(prompt_file_path):
     """Loads a prompt template string from the specified file path."""
     try:
-        with open(prompt_file_path, "r", encoding="utf-8") as f:
-            return f.read()
+        return _read_prompt_file(str(prompt_file_path))
     except Exception as e:
         logging.error(f"Error reading prompt file {prompt_file_path}: {e}")
-        return None
\ No newline at end of file
+        return None
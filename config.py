@@ -5,132 +5,135 @@ import logging
 from dotenv import load_dotenv
 from pathlib import Path
 
-# Add print statements BEFORE logging might be fully configured
-print("[CONFIG_DEBUG] config.py loading...")
+# Debug output is printed (logging may not be configured yet) only when CONFIG_DEBUG is set,
+# either in the shell environment or in .env.
+CONFIG_DEBUG = bool(os.getenv("CONFIG_DEBUG"))
+
+def _debug(message, *args):
+    """
+    Prints a [CONFIG_DEBUG] line if CONFIG_DEBUG is enabled; otherwise does nothing.
+    Arguments are %-formatted only when printing, so disabled calls cost no string formatting.
+    """
+    if CONFIG_DEBUG:
+        print(message % args if args else message)
+
+_debug("[CONFIG_DEBUG] config.py loading...")
 
 # Load environment variables
-print("[CONFIG_DEBUG] Calling load_dotenv()...")
+_debug("[CONFIG_DEBUG] Calling load_dotenv()...")
 load_dotenv()
-print("[CONFIG_DEBUG] load_dotenv() finished.")
+_environ = os.environ # Looked up once; all settings below are read through _env
+CONFIG_DEBUG = CONFIG_DEBUG or bool(_environ.get("CONFIG_DEBUG"))
+_debug("[CONFIG_DEBUG] load_dotenv() finished.")
+
+
+def _env(name, default, caster=str):
+    """
+    Reads an environment variable and casts it, falling back to the default if it is missing or invalid.
+    Surrounding whitespace and double quotes (a common .env mistake) are stripped first.
+    """
+    raw_value = _environ.get(name)
+    value_str = raw_value.strip().strip('"') if raw_value else ""
+    if not value_str:
+        _debug("[CONFIG_DEBUG] %s not found in .env, using default: %s", name, default)
+        return default
+    try:
+        value = caster(value_str)
+    except (ValueError, TypeError) as e:
+        _debug("[CONFIG_DEBUG] ERROR parsing %s: %s. Falling back to default.", name, e)
+        logging.warning(f"Invalid {name} value '{raw_value}' in .env. Using default: {default}")
+        return default
+    _debug("[CONFIG_DEBUG] %s from .env: '%s' -> %s", name, raw_value, value)
+    return value
 
 # --- AI Provider Selection ---
 # User can choose 'openai' or 'gemini' in the .env file. Defaults to 'openai'.
-AI_PROVIDER = os.getenv("AI_PROVIDER", "openai").lower()
-print(f"[CONFIG_DEBUG] AI_PROVIDER set to: '{AI_PROVIDER}'")
+AI_PROVIDER = _env("AI_PROVIDER", "openai").lower()
+_debug("[CONFIG_DEBUG] AI_PROVIDER set to: '%s'", AI_PROVIDER)
 
 # --- API Keys ---
-YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") # Added for Gemini
-PROXY_USERNAME = os.getenv("PROXY_USERNAME")
-PROXY_PASSWORD = os.getenv("PROXY_PASSWORD")
+YOUTUBE_API_KEY = _environ.get("YOUTUBE_API_KEY")
+OPENAI_API_KEY = _environ.get("OPENAI_API_KEY")
+GEMINI_API_KEY = _environ.get("GEMINI_API_KEY") # Added for Gemini
+PROXY_USERNAME = _environ.get("PROXY_USERNAME")
+PROXY_PASSWORD = _environ.get("PROXY_PASSWORD")
 
-print(f"[CONFIG_DEBUG] Raw YOUTUBE_API_KEY from .env: {'Exists' if YOUTUBE_API_KEY else 'Not Found'}")
-print(f"[CONFIG_DEBUG] Raw OPENAI_API_KEY from .env: {'Exists' if OPENAI_API_KEY else 'Not Found'}")
-print(f"[CONFIG_DEBUG] Raw GEMINI_API_KEY from .env: {'Exists' if GEMINI_API_KEY else 'Not Found'}") # Added
+if CONFIG_DEBUG:
+    for _key_name, _key_value in (("YOUTUBE_API_KEY", YOUTUBE_API_KEY), ("OPENAI_API_KEY", OPENAI_API_KEY), ("GEMINI_API_KEY", GEMINI_API_KEY)):
+        _debug("[CONFIG_DEBUG] Raw %s from .env: %s", _key_name, 'Exists' if _key_value else 'Not Found')
 
 # --- OpenAI Model Configuration ---
-print("\n[CONFIG_DEBUG] --- Loading OpenAI Config ---")
+_debug("\n[CONFIG_DEBUG] --- Loading OpenAI Config ---")
 DEFAULT_OPENAI_MODEL = "gpt-4.1-mini"
 DEFAULT_MAX_TOKENS = 1000
 DEFAULT_TEMPERATURE = 0.5
 DEFAULT_CONTEXT_LIMIT = 4096
 
 # --- Model Name ---
-model_name_str = os.getenv("OPENAI_MODEL_NAME")
-print(f"[CONFIG_DEBUG] Raw OPENAI_MODEL_NAME from .env: '{model_name_str}'")
-# Strip quotes if present (best to fix .env, but this helps debugging)
-if model_name_str and model_name_str.startswith('"') and model_name_str.endswith('"'):
-    print("[CONFIG_DEBUG] Note: OPENAI_MODEL_NAME has quotes in .env.")
-    OPENAI_MODEL_NAME = model_name_str.strip('"') or DEFAULT_OPENAI_MODEL
-else:
-    OPENAI_MODEL_NAME = model_name_str or DEFAULT_OPENAI_MODEL
+OPENAI_MODEL_NAME = _env("OPENAI_MODEL_NAME", DEFAULT_OPENAI_MODEL)
 
 # --- Max Tokens ---
-OPENAI_MAX_TOKENS = DEFAULT_MAX_TOKENS # Start with default
-max_tokens_str = os.getenv("OPENAI_MAX_TOKENS")
-print(f"[CONFIG_DEBUG] Raw OPENAI_MAX_TOKENS from .env: '{max_tokens_str}' (Type: {type(max_tokens_str)})")
-if max_tokens_str:
-    try:
-        cleaned_max_tokens_str = max_tokens_str.strip()
-        OPENAI_MAX_TOKENS = int(cleaned_max_tokens_str)
-        print(f"[CONFIG_DEBUG] Successfully parsed OPENAI_MAX_TOKENS: {OPENAI_MAX_TOKENS}")
-    except (ValueError, TypeError) as e:
-        print(f"[CONFIG_DEBUG] ERROR parsing OPENAI_MAX_TOKENS: {e}. Falling back to default.")
-        logging.warning(f"Invalid OPENAI_MAX_TOKENS value '{max_tokens_str}' in .env. Using default: {DEFAULT_MAX_TOKENS}")
-        OPENAI_MAX_TOKENS = DEFAULT_MAX_TOKENS
-else:
-    print(f"[CONFIG_DEBUG] OPENAI_MAX_TOKENS not found in .env, using default: {DEFAULT_MAX_TOKENS}")
+OPENAI_MAX_TOKENS = _env("OPENAI_MAX_TOKENS", DEFAULT_MAX_TOKENS, int)
 
 # --- Temperature ---
-OPENAI_TEMPERATURE = DEFAULT_TEMPERATURE # Start with default
-temp_str = os.getenv("OPENAI_TEMPERATURE")
-print(f"[CONFIG_DEBUG] Raw OPENAI_TEMPERATURE from .env: '{temp_str}' (Type: {type(temp_str)})")
-if temp_str:
-    try:
-        cleaned_temp_str = temp_str.strip()
-        OPENAI_TEMPERATURE = float(cleaned_temp_str)
-        print(f"[CONFIG_DEBUG] Successfully parsed OPENAI_TEMPERATURE: {OPENAI_TEMPERATURE}")
-    except (ValueError, TypeError) as e:
-        print(f"[CONFIG_DEBUG] ERROR parsing OPENAI_TEMPERATURE: {e}. Falling back to default.")
-        logging.warning(f"Invalid OPENAI_TEMPERATURE value '{temp_str}' in .env. Using default: {DEFAULT_TEMPERATURE}")
-        OPENAI_TEMPERATURE = DEFAULT_TEMPERATURE
-else:
-    print(f"[CONFIG_DEBUG] OPENAI_TEMPERATURE not found in .env, using default: {DEFAULT_TEMPERATURE}")
+OPENAI_TEMPERATURE = _env("OPENAI_TEMPERATURE", DEFAULT_TEMPERATURE, float)
 
 # --- Context Limit ---
-OPENAI_CONTEXT_LIMIT = DEFAULT_CONTEXT_LIMIT # Start with default
-limit_str = os.getenv("OPENAI_CONTEXT_LIMIT")
-print(f"[CONFIG_DEBUG] Raw OPENAI_CONTEXT_LIMIT from .env: '{limit_str}' (Type: {type(limit_str)})")
-if limit_str:
-    try:
-        cleaned_limit_str = limit_str.strip()
-        OPENAI_CONTEXT_LIMIT = int(cleaned_limit_str)
-        print(f"[CONFIG_DEBUG] Successfully parsed OPENAI_CONTEXT_LIMIT: {OPENAI_CONTEXT_LIMIT}")
-    except (ValueError, TypeError) as e:
-        print(f"[CONFIG_DEBUG] ERROR parsing OPENAI_CONTEXT_LIMIT: {e}. Falling back to default.")
-        logging.warning(f"Invalid OPENAI_CONTEXT_LIMIT value '{limit_str}' in .env. Using default: {DEFAULT_CONTEXT_LIMIT}")
-        OPENAI_CONTEXT_LIMIT = DEFAULT_CONTEXT_LIMIT
-else:
-    print(f"[CONFIG_DEBUG] OPENAI_CONTEXT_LIMIT not found in .env, using default: {DEFAULT_CONTEXT_LIMIT}")
+OPENAI_CONTEXT_LIMIT = _env("OPENAI_CONTEXT_LIMIT", DEFAULT_CONTEXT_LIMIT, int)
+
+# --- Max Concurrency (parallel chunk requests) ---
+DEFAULT_OPENAI_MAX_CONCURRENCY = 4
+OPENAI_MAX_CONCURRENCY = max(1, _env("OPENAI_MAX_CONCURRENCY", DEFAULT_OPENAI_MAX_CONCURRENCY, int))
+
+# --- Requests Per Minute (client-side rate limit, 0 disables it) ---
+DEFAULT_OPENAI_REQUESTS_PER_MINUTE = 60
+OPENAI_REQUESTS_PER_MINUTE = max(0, _env("OPENAI_REQUESTS_PER_MINUTE", DEFAULT_OPENAI_REQUESTS_PER_MINUTE, int))
+
+# --- Parallel Video Processing ---
+DEFAULT_MAX_WORKERS = 4
+MAX_WORKERS = max(1, _env("MAX_WORKERS", DEFAULT_MAX_WORKERS, int))
+# Playlists processed at the same time (1 = one after another, in file order)
+DEFAULT_MAX_CONCURRENT_PLAYLISTS = 1
+MAX_CONCURRENT_PLAYLISTS = max(1, _env("MAX_CONCURRENT_PLAYLISTS", DEFAULT_MAX_CONCURRENT_PLAYLISTS, int))
+# Cap on AI requests in flight across all video workers (each worker also fans out its own chunks)
+DEFAULT_AI_MAX_REQUESTS_IN_FLIGHT = 8
+AI_MAX_REQUESTS_IN_FLIGHT = max(1, _env("AI_MAX_REQUESTS_IN_FLIGHT", DEFAULT_AI_MAX_REQUESTS_IN_FLIGHT, int))
+# Minimum seconds between transcript requests across all workers and playlists (0 disables it)
+DEFAULT_TRANSCRIPT_MIN_INTERVAL_SECONDS = 5.0
+TRANSCRIPT_MIN_INTERVAL_SECONDS = max(0.0, _env("TRANSCRIPT_MIN_INTERVAL_SECONDS", DEFAULT_TRANSCRIPT_MIN_INTERVAL_SECONDS, float))
 
 
 # --- Gemini Model Configuration ---
-print("\n[CONFIG_DEBUG] --- Loading Gemini Config ---")
+_debug("\n[CONFIG_DEBUG] --- Loading Gemini Config ---")
 DEFAULT_GEMINI_MODEL = "gemini-1.5-flash-latest"
 DEFAULT_GEMINI_MAX_TOKENS = 2048
 DEFAULT_GEMINI_TEMPERATURE = 0.5
+DEFAULT_GEMINI_CONTEXT_LIMIT = 1000000
+DEFAULT_GEMINI_MAX_CONCURRENCY = 4
 
-GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL_NAME", DEFAULT_GEMINI_MODEL)
-print(f"[CONFIG_DEBUG] Raw GEMINI_MODEL_NAME from .env: '{GEMINI_MODEL_NAME}'")
+GEMINI_MODEL_NAME = _env("GEMINI_MODEL_NAME", DEFAULT_GEMINI_MODEL)
 
 # --- Gemini Max Tokens ---
-GEMINI_MAX_TOKENS = DEFAULT_GEMINI_MAX_TOKENS
-gemini_max_tokens_str = os.getenv("GEMINI_MAX_TOKENS")
-print(f"[CONFIG_DEBUG] Raw GEMINI_MAX_TOKENS from .env: '{gemini_max_tokens_str}'")
-if gemini_max_tokens_str:
-    try:
-        GEMINI_MAX_TOKENS = int(gemini_max_tokens_str.strip())
-        print(f"[CONFIG_DEBUG] Successfully parsed GEMINI_MAX_TOKENS: {GEMINI_MAX_TOKENS}")
-    except (ValueError, TypeError) as e:
-        print(f"[CONFIG_DEBUG] ERROR parsing GEMINI_MAX_TOKENS: {e}. Falling back to default.")
-        GEMINI_MAX_TOKENS = DEFAULT_GEMINI_MAX_TOKENS
-else:
-    print(f"[CONFIG_DEBUG] GEMINI_MAX_TOKENS not found in .env, using default: {DEFAULT_GEMINI_MAX_TOKENS}")
+GEMINI_MAX_TOKENS = _env("GEMINI_MAX_TOKENS", DEFAULT_GEMINI_MAX_TOKENS, int)
 
 # --- Gemini Temperature ---
-GEMINI_TEMPERATURE = DEFAULT_GEMINI_TEMPERATURE
-gemini_temp_str = os.getenv("GEMINI_TEMPERATURE")
-print(f"[CONFIG_DEBUG] Raw GEMINI_TEMPERATURE from .env: '{gemini_temp_str}'")
-if gemini_temp_str:
-    try:
-        GEMINI_TEMPERATURE = float(gemini_temp_str.strip())
-        print(f"[CONFIG_DEBUG] Successfully parsed GEMINI_TEMPERATURE: {GEMINI_TEMPERATURE}")
-    except (ValueError, TypeError) as e:
-        print(f"[CONFIG_DEBUG] ERROR parsing GEMINI_TEMPERATURE: {e}. Falling back to default.")
-        GEMINI_TEMPERATURE = DEFAULT_GEMINI_TEMPERATURE
-else:
-    print(f"[CONFIG_DEBUG] GEMINI_TEMPERATURE not found in .env, using default: {DEFAULT_GEMINI_TEMPERATURE}")
+GEMINI_TEMPERATURE = _env("GEMINI_TEMPERATURE", DEFAULT_GEMINI_TEMPERATURE, float)
+
+# --- Gemini Context Limit ---
+GEMINI_CONTEXT_LIMIT = _env("GEMINI_CONTEXT_LIMIT", DEFAULT_GEMINI_CONTEXT_LIMIT, int)
+
+# --- Gemini Max Concurrency (parallel chunk requests) ---
+GEMINI_MAX_CONCURRENCY = max(1, _env("GEMINI_MAX_CONCURRENCY", DEFAULT_GEMINI_MAX_CONCURRENCY, int))
+
+
+# --- YouTube Data API Quota ---
+# quota_utils counts each API call once, but retries of a failed call (youtube_utils.YOUTUBE_API_RETRIES,
+# up to 4 per call) are billed by Google without being counted. The reserve is what absorbs them, so
+# keep it at several calls' worth of retries; the default covers 25 calls that exhaust all retries.
+DEFAULT_YOUTUBE_DAILY_QUOTA = 10000
+DEFAULT_YOUTUBE_QUOTA_RESERVE = 100
+YOUTUBE_DAILY_QUOTA = _env("YOUTUBE_DAILY_QUOTA", DEFAULT_YOUTUBE_DAILY_QUOTA, int)
+YOUTUBE_QUOTA_RESERVE = max(0, _env("YOUTUBE_QUOTA_RESERVE", DEFAULT_YOUTUBE_QUOTA_RESERVE, int))
 
 
 # --- File Paths ---
@@ -139,18 +142,12 @@ OUTPUT_DIR = Path("/Users/yannikmarkworth/Obsidian/Yannik/• YouTube-Importer")
 TRANSCRIPTS_DIR = OUTPUT_DIR / "Transcripts"
 SUMMARIES_DIR = OUTPUT_DIR / "Summaries"
 ATOMIC_NOTES_DIR = OUTPUT_DIR / "Atomic Notes"
-print(f"\n[CONFIG_DEBUG] Base Dir: {BASE_DIR}")
-print(f"[CONFIG_DEBUG] Output Dir: {OUTPUT_DIR}")
-
-# Ensure output directories exist
-try:
-    TRANSCRIPTS_DIR.mkdir(parents=True, exist_ok=True)
-    SUMMARIES_DIR.mkdir(parents=True, exist_ok=True)
-    ATOMIC_NOTES_DIR.mkdir(parents=True, exist_ok=True)
-    print(f"[CONFIG_DEBUG] Output directories ensured.")
-except Exception as e:
-    print(f"[CONFIG_DEBUG] ERROR creating output directories: {e}")
-    logging.error(f"Failed to create output directories: {e}", exc_info=True)
+SUMMARY_CACHE_DIR = BASE_DIR / ".summary_cache"
+_debug("\n[CONFIG_DEBUG] Base Dir: %s", BASE_DIR)
+_debug("[CONFIG_DEBUG] Output Dir: %s", OUTPUT_DIR)
+
+# Output directories are created on first write (file_utils.ensure_dir), not at import,
+# so scripts that only read settings don't touch the filesystem.
 
 # --- File Names ---
 PLAYLIST_URL_FILE = BASE_DIR / "playlist_url.txt"
@@ -158,7 +155,9 @@ CHUNK_PROMPT_FILE = BASE_DIR / "summarize_chunk_prompt.txt"
 FINAL_PROMPT_FILE = BASE_DIR / "summarize_final_prompt.txt"
 ATOMIC_NOTES_PROMPT_FILE = BASE_DIR / "atomic_notes_prompt.txt"
 ERROR_LOG_FILE = BASE_DIR / "error_log.log"
-print(f"[CONFIG_DEBUG] Log file path set to: {ERROR_LOG_FILE}")
+QUOTA_USAGE_FILE = BASE_DIR / "quota_usage.json"
+METADATA_CACHE_FILE = BASE_DIR / "metadata.sqlite"
+_debug("[CONFIG_DEBUG] Log file path set to: %s", ERROR_LOG_FILE)
 
-print("[CONFIG_DEBUG] config.py loading complete.")
+_debug("[CONFIG_DEBUG] config.py loading complete.")
 logging.info(f"Configuration loading complete from config.py. AI_PROVIDER is '{AI_PROVIDER}'.")
\ No newline at end of file
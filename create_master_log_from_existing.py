@@ -1,8 +1,11 @@
+import os
 import sys
 import re
+import time
 from pathlib import Path
-from datetime import datetime
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 
 try:
     import config
@@ -11,8 +14,68 @@ except ImportError:
     print("ERROR: Could not import config.py or file_utils.py. Make sure this script is in the same directory as your other files.")
     sys.exit(1)
 
-PLAYLIST_RE = re.compile(r"\*\*Playlist:\*\* \[\[Playlist (.*?)\]\]")
-TITLE_RE = re.compile(r"\*\*Title:\*\* (.*)")
+# One pass over the raw bytes finds both info-block lines; only the captured values are decoded.
+HEADER_FIELDS_RE = re.compile(rb"\*\*(?:Title:\*\* (?P<title>.*)|Playlist:\*\* \[\[Playlist (?P<playlist>.*?)\]\])")
+SUMMARY_SUFFIX = "– Summary.md"
+HEADER_READ_BYTES = 4096 # Front matter + info block; the summary body after it is never needed here
+
+def iter_summary_files(directory):
+    """
+    Recursively yields (path, name, mtime) for every summary file below `directory`.
+    os.scandir returns names and file types with the directory listing, and the
+    DirEntry caches its stat result, so each file costs one stat instead of several.
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_summary_files(entry.path)
+            elif entry.name.endswith(SUMMARY_SUFFIX) and entry.is_file():
+                yield entry.path, entry.name, entry.stat().st_mtime
+
+def extract_header_fields(data):
+    """Returns the first (title, playlist) values found in the summary bytes; either may be None."""
+    title = playlist = None
+    for match in HEADER_FIELDS_RE.finditer(data):
+        if title is None and match.group("title") is not None:
+            title = match.group("title").decode("utf-8", "ignore").strip()
+        elif playlist is None and match.group("playlist") is not None:
+            playlist = match.group("playlist").decode("utf-8", "ignore").strip()
+        if title is not None and playlist is not None:
+            break
+    return title, playlist
+
+def read_summary_data(summary_file, output_dir_prefix_len):
+    """Extracts the log fields from one (path, name, mtime) summary entry; returns None if the file can't be read."""
+    filepath, filename, mod_time = summary_file
+    try:
+        with open(filepath, "rb") as f:
+            content = f.read(HEADER_READ_BYTES)
+            video_title, playlist_name = extract_header_fields(content)
+            if len(content) == HEADER_READ_BYTES and (video_title is None or playlist_name is None):
+                # Unusually long header: fall back to the whole file.
+                content += f.read()
+                video_title, playlist_name = extract_header_fields(content)
+
+        # Only the first line is sliced out; the rest of the buffer is never copied.
+        first_line_end = content.find(b"\n")
+        return {
+            "video_url": content[:first_line_end if first_line_end >= 0 else len(content)].decode("utf-8").strip(),
+            "video_title": video_title or "Untitled Video",
+            "playlist_name": playlist_name or "Unknown Playlist",
+            "link_target": filepath[output_dir_prefix_len:],
+            "mod_time": mod_time,
+            "filename": filename,
+        }
+    except Exception as e:
+        print(f"  - Warning: Could not process file {filename}. Reason: {e}")
+        return None
+
+def write_playlist_log(playlist_name, playlist_log_path, playlist_log_md):
+    """Writes one playlist log (UTF-8 bytes) in a single call; errors are reported and don't stop the other playlists."""
+    try:
+        playlist_log_path.write_bytes(playlist_log_md)
+    except Exception as e:
+        print(f"    - ERROR: Could not write log file for playlist {playlist_name}. Reason: {e}")
 
 def create_log_from_existing_summaries():
     summaries_dir = config.SUMMARIES_DIR
@@ -25,7 +88,7 @@ def create_log_from_existing_summaries():
 
     print(f"Scanning for summary files in: {summaries_dir}")
     
-    summary_files = list(summaries_dir.rglob("*– Summary.md"))
+    summary_files = list(iter_summary_files(summaries_dir))
 
     if not summary_files:
         print("No summary files found to process.")
@@ -33,92 +96,70 @@ def create_log_from_existing_summaries():
 
     print(f"Found {len(summary_files)} summary files. Extracting information...")
 
-    summary_data_list = []
-    for filepath in summary_files:
-        try:
-            content = filepath.read_text(encoding="utf-8")
-            
-            video_url = content.splitlines()[0].strip()
-            title_match = TITLE_RE.search(content)
-            playlist_match = PLAYLIST_RE.search(content)
-
-            video_title = title_match.group(1).strip() if title_match else "Untitled Video"
-            playlist_name = playlist_match.group(1).strip() if playlist_match else "Unknown Playlist"
-            
-            mod_time = filepath.stat().st_mtime
-            relative_path = filepath.relative_to(output_dir)
-
-            summary_data_list.append({
-                "video_url": video_url,
-                "video_title": video_title,
-                "playlist_name": playlist_name,
-                "link_target": relative_path,
-                "mod_time": mod_time,
-                "filepath": filepath,
-            })
-
-        except Exception as e:
-            print(f"  - Warning: Could not process file {filepath.name}. Reason: {e}")
-            continue
+    # Link targets are paths relative to the output dir; slicing the prefix is cheaper than Path.relative_to.
+    output_dir_prefix_len = len(str(output_dir)) + 1
+    # Reading the files is pure I/O, so threads overlap it despite the GIL.
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as pool:
+        results = pool.map(lambda summary_file: read_summary_data(summary_file, output_dir_prefix_len), summary_files)
+        summary_data_list = [data for data in results if data is not None]
     
-    summary_data_list.sort(key=lambda x: x['mod_time'], reverse=True)
+    summary_data_list.sort(key=itemgetter('mod_time'), reverse=True)
 
-    # --- Generate Playlist-Specific Logs ---
+    # Group once by playlist and date and once by date alone. The list is already newest-first,
+    # so every group and the dates' insertion order come out sorted without further sorting.
     print("\nGrouping summaries by playlist to create individual logs...")
-    summaries_by_playlist = defaultdict(list)
+    summaries_by_playlist = defaultdict(lambda: defaultdict(list))
+    all_summaries_by_date = defaultdict(list)
+    day_start = day_end = 0.0
     for data in summary_data_list:
-        summaries_by_playlist[data['playlist_name']].append(data)
+        mod_time = data['mod_time']
+        if not day_start <= mod_time < day_end:
+            # Newest-first order means the local date only changes at day boundaries; format it once per day.
+            local = time.localtime(mod_time)
+            mod_date = time.strftime('%Y-%m-%d', local)
+            day_start = time.mktime((local.tm_year, local.tm_mon, local.tm_mday, 0, 0, 0, 0, 0, -1))
+            day_end = time.mktime((local.tm_year, local.tm_mon, local.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+        data['mod_date'] = mod_date
+        summaries_by_playlist[data['playlist_name']][mod_date].append(data)
+        all_summaries_by_date[mod_date].append(data)
+
+    # --- Generate Playlist-Specific Logs ---
 
-    for playlist_name, items in summaries_by_playlist.items():
+    # Log contents are built here; the writes to the separate playlist folders overlap on a small pool.
+    write_executor = ThreadPoolExecutor(max_workers=8)
+    for playlist_name, by_date in summaries_by_playlist.items():
         cleaned_playlist_name = file_utils.clean_filename(playlist_name)
         # Use the new naming convention: [playlistname]_playlist_log.md
         playlist_log_path = config.SUMMARIES_DIR / cleaned_playlist_name / f"{cleaned_playlist_name}_playlist_log.md"
         print(f"  - Generating log for playlist: {playlist_name}...")
         
-        by_date = defaultdict(list)
-        for item in items:
-            mod_date_str = datetime.fromtimestamp(item['mod_time']).strftime('%Y-%m-%d')
-            by_date[mod_date_str].append(item)
-        
-        sorted_dates = sorted(by_date.keys(), reverse=True)
-        
-        playlist_log_md = ""
-        for date_str in sorted_dates:
-            playlist_log_md += f"## Processed on {date_str}\n\n"
+        # Logs are assembled as UTF-8 bytes so the finished file needs no second encoding pass.
+        playlist_log_md = bytearray()
+        for date_str in by_date:
+            playlist_log_md += b"## Processed on " + date_str.encode("ascii") + b"\n\n"
             for item in by_date[date_str]:
                 display_text = f"{item['playlist_name']} – {item['video_title']}"
-                link_target_stem = item['filepath'].name.removesuffix('.md')
+                link_target_stem = item['filename'].removesuffix('.md')
                 
-                playlist_log_md += f"{item['video_url']}\n"
-                playlist_log_md += f"[[{link_target_stem}|{display_text}]]\n\n"
+                playlist_log_md += f"{item['video_url']}\n[[{link_target_stem}|{display_text}]]\n\n".encode("utf-8")
                 
-        try:
-            playlist_log_path.write_text(playlist_log_md, encoding="utf-8")
-        except Exception as e:
-            print(f"    - ERROR: Could not write log file for playlist {playlist_name}. Reason: {e}")
+        write_executor.submit(write_playlist_log, playlist_name, playlist_log_path, playlist_log_md)
+    write_executor.shutdown(wait=True)
 
     # --- Generate Master Log ---
     print("\nGenerating new master summary log content...")
-    master_log_md = ""
-    all_summaries_by_date = defaultdict(list)
-    for data in summary_data_list:
-        mod_date_str = datetime.fromtimestamp(data['mod_time']).strftime('%Y-%m-%d')
-        all_summaries_by_date[mod_date_str].append(data)
-    
-    sorted_all_dates = sorted(all_summaries_by_date.keys(), reverse=True)
-
-    for date_str in sorted_all_dates:
-        master_log_md += f"## Processed on {date_str}\n\n"
+    master_log_md = bytearray()
+    for date_str in all_summaries_by_date:
+        master_log_md += b"## Processed on " + date_str.encode("ascii") + b"\n\n"
         for item in all_summaries_by_date[date_str]:
             display_text = f"{item['playlist_name']} – {item['video_title']}"
-            link_target_str = str(item['link_target']).replace('\\', '/')
+            link_target_str = item['link_target'].replace('\\', '/')
             link_target_stem = link_target_str.removesuffix('.md')
             
-            master_log_md += f"{item['video_url']}\n"
-            master_log_md += f"[[{link_target_stem}|{display_text}]]\n\n"
+            master_log_md += f"{item['video_url']}\n[[{link_target_stem}|{display_text}]]\n\n".encode("utf-8")
             
     try:
-        master_log_filepath.write_text(master_log_md, encoding="utf-8")
+        master_log_filepath.write_bytes(master_log_md)
         print("-" * 30)
         print(f"SUCCESS: New 'master_summary_log.md' has been created with {len(summary_data_list)} entries.")
         print(f"You can find the file at: {master_log_filepath}")
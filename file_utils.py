@@ -1,18 +1,35 @@
 import config
+import functools
+import json
 import logging
+import os
 import re
+import shutil
 import yaml
 from datetime import datetime
 from pathlib import Path
 
+# --- Precompiled Patterns ---
+ISO_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+ISO_DATE_PREFIX_RE = re.compile(r'^(\d{4}-\d{2}-\d{2})')
+CLOCK_DURATION_RE = re.compile(r'^\d+:\d{2}(:\d{2})?$')
+ISO_DURATION_RE = re.compile(r'^PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?$')
+# Characters invalid in Windows/Unix filenames: \ / * ? : " < > | #
+INVALID_FILENAME_CHARS_TABLE = str.maketrans('', '', '\\/*?:"<>|#')
+DELIMITER_LINE_RE = re.compile(r'^[ \t\r\f\v]*---[ \t\r\f\v]*(?:\n|\Z)', re.MULTILINE)
+TRANSCRIPT_SECTION_MARKER = "\n\n---\n\n## Transcript" # Separates a transcript file's description from its transcript
+YAML_UNSAFE_CHAR_RE = re.compile('[\x7f-\x9f\u2028\u2029\ufffe\uffff]')
+YAML_PLAIN_SAFE_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_ .,/()&!+\-]*(?<! )$')
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper) # libyaml's C emitter when available
+YAML_RESERVED_WORDS = {"y", "n", "yes", "no", "on", "off", "true", "false", "null"}
 
 def format_iso_date(date_str):
     """Converts '2024-01-15T12:30:00Z' to '2024-01-15'. Passes through already-clean dates."""
     if not date_str or date_str == "N/A":
         return date_str
-    if re.match(r'^\d{4}-\d{2}-\d{2}$', date_str):
+    if ISO_DATE_RE.match(date_str):
         return date_str
-    m = re.match(r'^(\d{4}-\d{2}-\d{2})', date_str)
+    m = ISO_DATE_PREFIX_RE.match(date_str)
     return m.group(1) if m else date_str
 
 
@@ -20,9 +37,9 @@ def format_iso_duration(duration_str):
     """Converts 'PT1H23M45S' to '1:23:45' or 'PT11M58S' to '11:58'. Passes through already-clean values."""
     if not duration_str or duration_str == "N/A":
         return duration_str
-    if re.match(r'^\d+:\d{2}(:\d{2})?$', duration_str):
+    if CLOCK_DURATION_RE.match(duration_str):
         return duration_str
-    m = re.match(r'^PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?$', duration_str)
+    m = ISO_DURATION_RE.match(duration_str)
     if not m:
         return duration_str
     hours = int(m.group(1) or 0)
@@ -34,6 +51,7 @@ def format_iso_duration(duration_str):
 
 # --- Filename Handling ---
 
+@functools.lru_cache(maxsize=2048) # Playlist names repeat for every video they contain
 def clean_filename(name_part): # Renamed 'title' to 'name_part' for generic use
     """
     Removes or replaces characters invalid in filenames/directory names
@@ -42,8 +60,8 @@ def clean_filename(name_part): # Renamed 'title' to 'name_part' for generic use
     """
     if not name_part:
         name_part = "untitled"
-    # Remove characters invalid in Windows/Unix filenames: \ / * ? : " < > | #
-    cleaned_name = re.sub(r'[\\/*?:"<>|#]', "", name_part)
+    # Remove characters invalid in Windows/Unix filenames (str.translate is a single C-level pass)
+    cleaned_name = name_part.translate(INVALID_FILENAME_CHARS_TABLE)
     
     max_len = 100 # Arbitrary limit
     if len(cleaned_name) > max_len:
@@ -66,6 +84,38 @@ def generate_filename_component(playlist_name_for_filename, video_id, title):
     # Filename Structure: Playlist Name – Cleaned Title – VIDEO_ID
     return f"{playlist_name_for_filename} – {cleaned_title} – {video_id}"
 
+# --- YAML Front Matter ---
+
+def _yaml_scalar(value):
+    """
+    Formats one value as a YAML scalar. Simple words stay plain; everything else becomes a
+    double-quoted string, using JSON escaping, which is valid YAML. Characters JSON leaves raw
+    but YAML rejects or reads as line breaks (DEL, C1 controls, U+2028/9) get a \\u escape too.
+    """
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    value = str(value)
+    # Values with '---' are quoted too: valid plain YAML, but line-based front matter splitters could misread them.
+    # (Leading or trailing whitespace already fails YAML_PLAIN_SAFE_RE.)
+    if YAML_PLAIN_SAFE_RE.match(value) and value.lower() not in YAML_RESERVED_WORDS and "---" not in value:
+        return value
+    return YAML_UNSAFE_CHAR_RE.sub(lambda match: f"\\u{ord(match.group()):04x}", json.dumps(value, ensure_ascii=False))
+
+def dump_flat_yaml(mapping):
+    """Serializes a flat dict of scalars as YAML lines, without PyYAML's emitter overhead."""
+    return "".join(f"{key}: {_yaml_scalar(value)}\n" for key, value in mapping.items())
+
+# --- Directories ---
+
+@functools.lru_cache(maxsize=None)
+def ensure_dir(directory):
+    """Creates a directory (and parents) if needed. Cached, so repeated writes into the same folder cost no extra syscalls."""
+    Path(directory).mkdir(parents=True, exist_ok=True)
+
 # --- File Existence Checks ---
 
 def check_summary_exists(video_id, cleaned_playlist_foldername): # MODIFIED: added cleaned_playlist_foldername
@@ -93,36 +143,135 @@ def check_summary_exists(video_id, cleaned_playlist_foldername): # MODIFIED: add
     found_file = next(glob_generator, None)
     exists = found_file is not None
     if exists:
-        logging.debug(f"Summary file found for {video_id} in folder '{cleaned_playlist_foldername}': {found_file}")
+        logging.debug("Summary file found for %s in folder '%s': %s", video_id, cleaned_playlist_foldername, found_file)
     else:
-        logging.debug(f"No summary file found matching pattern '{search_pattern}' for {video_id} in folder '{cleaned_playlist_foldername}'")
+        logging.debug("No summary file found matching pattern '%s' for %s in folder '%s'", search_pattern, video_id, cleaned_playlist_foldername)
     return exists
 
-# --- File Reading --- (No changes needed in read_transcript_from_file)
+def get_existing_summary_video_ids(cleaned_playlist_foldername):
+    """
+    Collects the video IDs of all summaries already present in a playlist subfolder
+    with a single directory scan, so callers can test many videos with set lookups
+    instead of one glob per video.
+
+    Summary files are named '... – VIDEO_ID – Summary.md'; the ID is the segment
+    right before the ' – Summary.md' suffix.
+
+    Args:
+        cleaned_playlist_foldername (str): The name of the subfolder (cleaned playlist name).
+
+    Returns:
+        set: Video IDs that already have a summary file (empty if the folder is missing).
+    """
+    playlist_summary_subfolder = config.SUMMARIES_DIR / cleaned_playlist_foldername
+    suffix = " – Summary.md"
+    existing_ids = set()
+    try:
+        with os.scandir(playlist_summary_subfolder) as entries:
+            for entry in entries:
+                if entry.name.endswith(suffix) and entry.is_file():
+                    existing_ids.add(entry.name[:-len(suffix)].rsplit(" – ", 1)[-1])
+    except FileNotFoundError:
+        return existing_ids
+    logging.debug("Found %d existing summaries in folder '%s'.", len(existing_ids), cleaned_playlist_foldername)
+    return existing_ids
+
+def get_existing_transcript_paths(cleaned_playlist_foldername):
+    """
+    Maps video IDs to their existing transcript files in a playlist subfolder, using a
+    single directory scan. Transcript files are named '... – VIDEO_ID.md'.
+
+    Args:
+        cleaned_playlist_foldername (str): The name of the subfolder (cleaned playlist name).
+
+    Returns:
+        dict[str, Path]: Video ID -> transcript file path (empty if the folder is missing).
+    """
+    playlist_transcript_subfolder = config.TRANSCRIPTS_DIR / cleaned_playlist_foldername
+    transcript_paths = {}
+    try:
+        with os.scandir(playlist_transcript_subfolder) as entries:
+            for entry in entries:
+                if entry.name.endswith(".md") and " – " in entry.name and entry.is_file():
+                    video_id = entry.name[:-len(".md")].rsplit(" – ", 1)[-1]
+                    transcript_paths[video_id] = Path(entry.path)
+    except FileNotFoundError:
+        pass
+    return transcript_paths
+
+# --- File Reading ---
 def read_transcript_from_file(transcript_filepath):
+    """
+    Reads the transcript text (everything after the YAML front matter) from a transcript file.
+    The file is opened once; a missing file raises FileNotFoundError so callers can fall back
+    to fetching the transcript without a separate exists() check. Returns None if the file
+    cannot be read or has no content after the front matter.
+    """
     transcript_filepath = Path(transcript_filepath)
-    if not transcript_filepath.exists():
-        logging.warning(f"Attempted to read non-existent transcript file: {transcript_filepath}")
-        return None
     try:
-        with open(transcript_filepath, "r", encoding="utf-8") as f: lines = f.readlines()
-        content_started, yaml_delimiters_found, transcript_lines = False, 0, []
-        for line in lines:
-            if line.strip() == '---':
-                yaml_delimiters_found += 1
-                if yaml_delimiters_found == 2: content_started = True
-                continue 
-            if content_started: transcript_lines.append(line)
-        if not transcript_lines:
+        # Split on '---' lines in one regex pass: everything after the second one is content,
+        # and later '---' separator lines are dropped, as the old line-by-line loop did.
+        sections = DELIMITER_LINE_RE.split(transcript_filepath.read_text(encoding="utf-8"))
+        content = "".join(sections[2:])
+        if not content:
              logging.warning(f"Could not extract transcript content (post-YAML) from {transcript_filepath}")
              return None
-        return "".join(transcript_lines).strip()
+        return content.strip()
+    except FileNotFoundError:
+        raise
     except Exception as e:
         logging.error(f"Error reading transcript file {transcript_filepath}: {e}")
         return None
 
+def read_video_details_from_transcript(transcript_filepath):
+    """
+    Rebuilds the video details dictionary (same keys as youtube_utils.get_video_details)
+    from the YAML front matter and description section that create_transcript_file wrote,
+    so videos with an existing transcript need no YouTube API call.
+
+    Returns:
+        dict | None: The video details, or None if the file is missing or lacks the metadata.
+    """
+    try:
+        content = Path(transcript_filepath).read_text(encoding="utf-8")
+        # Split on whole '---' lines only; a value like 'Best of ---' must not end the front matter.
+        _, front_matter, body = DELIMITER_LINE_RE.split(content, 2)
+        metadata = yaml.safe_load(front_matter) or {}
+    except Exception as e:
+        logging.debug("Could not read video details from transcript %s: %s", transcript_filepath, e)
+        return None
+    if not metadata.get("video_id") or not metadata.get("title"):
+        return None
+    description = ""
+    body = body.lstrip()
+    if body.startswith("## Description"):
+        # The description ends where create_transcript_file starts the transcript section, not at
+        # its first '---' line: YouTube descriptions often contain separator lines of their own.
+        # The last marker is used, since fetched transcripts are single-line text that can't contain it.
+        description = body[len("## Description"):].rpartition(TRANSCRIPT_SECTION_MARKER)[0].strip()
+    return {
+        "title": metadata["title"],
+        "description": description,
+        "publishedAt": metadata.get("upload_date"),
+        "channelTitle": metadata.get("channel", "Unknown Channel"),
+        "channelId": metadata.get("channel_id"),
+        "duration": metadata.get("duration"),
+        "videoId": metadata["video_id"],
+        "videoUrl": metadata.get("video_url", f"https://www.youtube.com/watch?v={metadata['video_id']}"),
+    }
+
 # --- File Writing ---
 
+def write_text_atomic(filepath, text):
+    """
+    Writes a UTF-8 text file via a temp file and os.replace, so a crash mid-write never
+    leaves a truncated file behind. This matters for summaries: their mere presence marks
+    a video as done. No fsync - durability is left to the filesystem, as before.
+    """
+    tmp_path = filepath.with_name(filepath.name + ".tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, filepath)
+
 def create_transcript_file(video_details, transcript, transcript_filepath):
     """
     Creates or overwrites the transcript Markdown file.
@@ -142,12 +291,13 @@ def create_transcript_file(video_details, transcript, transcript_filepath):
             "duration": video_details.get("duration", "N/A"),
         }
         # Ensure the subfolder exists
-        transcript_filepath.parent.mkdir(parents=True, exist_ok=True)
-        with open(transcript_filepath, "w", encoding="utf-8") as f:
-            f.write("---\n"); yaml.dump(metadata, f, allow_unicode=True, default_flow_style=False, sort_keys=False, width=10000); f.write("---\n\n")
-            description = video_details.get('description', '').strip()
-            if description: f.write("## Description\n\n" + description + "\n\n---\n\n")
-            f.write("## Transcript\n\n" + (transcript if transcript else "*Transcript not available or empty.*"))
+        ensure_dir(transcript_filepath.parent)
+        description = video_details.get('description', '').strip()
+        parts = ["---\n", dump_flat_yaml(metadata), "---\n\n"]
+        if description: parts.append("## Description\n\n" + description)
+        parts.append((TRANSCRIPT_SECTION_MARKER if description else "## Transcript") + "\n\n" + (transcript if transcript else "*Transcript not available or empty.*"))
+        # One encode and one write for the whole file
+        write_text_atomic(transcript_filepath, "".join(parts))
         logging.info(f"Successfully wrote transcript file: {transcript_filepath}")
         return True
     except Exception as e:
@@ -176,7 +326,7 @@ def create_atomic_note_files(notes_data, video_details, atomic_notes_subfolder,
 
     atomic_notes_subfolder = Path(atomic_notes_subfolder)
     try:
-        atomic_notes_subfolder.mkdir(parents=True, exist_ok=True)
+        ensure_dir(atomic_notes_subfolder)
     except Exception as e:
         logging.error(f"Failed to create atomic notes subfolder {atomic_notes_subfolder}: {e}")
         return -1
@@ -283,7 +433,7 @@ def create_summary_file(video_details, summary, summary_filepath, transcript_fil
     try:
         logging.info(f"Writing summary file: {summary_filepath}")
         print(f"Saving summary file: {summary_filepath.relative_to(config.OUTPUT_DIR)}")
-        summary_filepath.parent.mkdir(parents=True, exist_ok=True)
+        ensure_dir(summary_filepath.parent)
 
         channel_title = video_details.get('channelTitle', 'N/A')
 
@@ -317,43 +467,65 @@ def create_summary_file(video_details, summary, summary_filepath, transcript_fil
 
         frontmatter["processed_date"] = datetime.now().strftime("%Y-%m-%d")
 
-        with open(summary_filepath, "w", encoding="utf-8") as f:
-            # Write YAML frontmatter
-            f.write("---\n")
-            yaml.dump(frontmatter, f, allow_unicode=True, default_flow_style=False, sort_keys=False, width=10000)
-            f.write("---\n\n")
-
-            # Write video info block
-            video_url = video_details.get("videoUrl", "N/A")
-            video_title = video_details.get("title", "N/A")
-            uploaded = video_details.get("publishedAt", "N/A")
-            duration = video_details.get("duration", "N/A")
-
-            f.write(f"{video_url}\n\n")
-            f.write(f"**Title:** {video_title}\n")
-            f.write(f"**Video URL:** {video_url}\n")
-            f.write(f"**Channel:** [[▶️ {channel_title}]]\n")
-            f.write(f"**Uploaded:** {uploaded}\n")
-            f.write(f"**Duration:** {duration}\n")
-            f.write(f"**Playlist:** [[Playlist {display_playlist_name}]]\n\n")
-
-            # Write the summary content
-            f.write("## AI Summary\n\n")
-            f.write(summary if summary.strip() else "*Summary could not be generated or was empty.*")
-            f.write("\n\n")
-
-            # Write atomic notes link if available
-            if atomic_notes_folder_name:
-                f.write("## Atomic Notes\n\n")
-                f.write(f"[[{atomic_notes_folder_name}]]\n\n")
-
-            # Write transcript link
-            f.write("## Transcript\n\n")
-            f.write(f"[[{link_target_transcript_name}]]\n")
+        video_url = video_details.get("videoUrl", "N/A")
+        video_title = video_details.get("title", "N/A")
+        uploaded = video_details.get("publishedAt", "N/A")
+        duration = video_details.get("duration", "N/A")
+
+        parts = [
+            # YAML frontmatter
+            "---\n",
+            yaml.dump(frontmatter, Dumper=YAML_DUMPER, allow_unicode=True, default_flow_style=False, sort_keys=False, width=10000),
+            "---\n\n",
+            # Video info block
+            f"{video_url}\n\n",
+            f"**Title:** {video_title}\n",
+            f"**Video URL:** {video_url}\n",
+            f"**Channel:** [[▶️ {channel_title}]]\n",
+            f"**Uploaded:** {uploaded}\n",
+            f"**Duration:** {duration}\n",
+            f"**Playlist:** [[Playlist {display_playlist_name}]]\n\n",
+            # Summary content
+            "## AI Summary\n\n",
+            summary if summary.strip() else "*Summary could not be generated or was empty.*",
+            "\n\n",
+        ]
+        # Atomic notes link if available
+        if atomic_notes_folder_name:
+            parts.append(f"## Atomic Notes\n\n[[{atomic_notes_folder_name}]]\n\n")
+        # Transcript link
+        parts.append(f"## Transcript\n\n[[{link_target_transcript_name}]]\n")
+
+        # One encode and one write for the whole file
+        write_text_atomic(summary_filepath, "".join(parts))
 
         logging.info(f"Successfully wrote summary file: {summary_filepath}")
         return True
     except Exception as e:
         logging.error(f"Error writing summary file {summary_filepath}: {e}", exc_info=True)
         print(f"Error writing summary file {summary_filepath.name}: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def prepend_to_file(filepath, text, separator=""):
+    """
+    Writes `text` in front of a file's existing content (newest-first logs).
+
+    The old content is streamed into a temp file behind the new text instead of being
+    read into memory, and the temp file then replaces the original, so an interrupted
+    write never leaves a truncated log. `separator` goes between the new text and
+    non-empty old content. Raises OSError on failure; the original file is unchanged then.
+    """
+    filepath = Path(filepath)
+    tmp_path = filepath.with_name(filepath.name + ".tmp")
+    with open(tmp_path, "wb") as out:
+        out.write(text.encode("utf-8"))
+        try:
+            with open(filepath, "rb") as existing:
+                first_block = existing.read(1 << 16)
+                if first_block:
+                    out.write(separator.encode("utf-8"))
+                    out.write(first_block)
+                    shutil.copyfileobj(existing, out, 1 << 20)
+        except FileNotFoundError:
+            pass
+    os.replace(tmp_path, filepath)
@@ -1,4 +1,8 @@
+import atexit
+import functools
 import logging
+import logging.handlers
+import queue
 import sys
 import re
 from datetime import datetime
@@ -10,13 +14,39 @@ import youtube_utils
 import transcript_utils
 import file_utils
 import ai_utils
-import time
+import quota_utils
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from enum import Enum
+from typing import NamedTuple
 
 SUMMARIES_LOG_FOR_CURRENT_RUN = []
+_summaries_log_lock = threading.Lock()
+_playlist_log_lock = threading.Lock()
+_thread_local = threading.local()
 
 
+class VideoResult(Enum):
+    PROCESSED = "processed"
+    FAILED = "failed"
+
+class SummaryLogEntry(NamedTuple):
+    """One processed video for the playlist and master logs (lighter than a dict per video)."""
+    link_target: str
+    video_title: str
+    playlist_context: str
+    is_placeholder: bool
+    video_url: str
+    summary_filename_stem: str
+    video_index: int # Position among the playlist's videos processed this run; logs are written in this order
+    playlist_position: int = 0 # Position of the playlist in the URL file, set by process_playlist
+
+PLAYLIST_ID_RE = re.compile(r'list=([a-zA-Z0-9_-]+)')
+
+
+@functools.lru_cache(maxsize=None)
 def _load_taxonomy_for_prompt(taxonomy_path):
-    """Loads categories.txt and returns a bullet list of all category paths for prompt injection."""
+    """Loads categories.txt and returns a bullet list of all category paths for prompt injection. Cached for the run."""
     taxonomy_path = Path(taxonomy_path)
     if not taxonomy_path.exists():
         logging.warning(f"Taxonomy file not found: {taxonomy_path}")
@@ -56,7 +86,17 @@ def setup_logging(log_level=logging.INFO):
     console_formatter = logging.Formatter('%(levelname)s: %(message)s') 
     file_handler.setFormatter(file_formatter)
     console_handler.setFormatter(console_formatter)
-    handlers_list = [file_handler, console_handler]
+    # File records are written in batches of up to 512; errors flush the batch at once.
+    buffered_file_handler = logging.handlers.MemoryHandler(capacity=512, flushLevel=logging.ERROR, target=file_handler)
+    buffered_file_handler.setLevel(log_level)
+    # Worker threads only enqueue records; formatting and file/console writes happen on the listener thread.
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, buffered_file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    # atexit runs in reverse order: drain the queue first, then flush what is still buffered.
+    atexit.register(buffered_file_handler.close)
+    atexit.register(listener.stop)
+    handlers_list = [logging.handlers.QueueHandler(log_queue)]
     try:
         if force_reconfigure: logging.basicConfig(level=log_level, handlers=handlers_list, force=True)
         else: 
@@ -72,55 +112,184 @@ def setup_logging(log_level=logging.INFO):
 
 
 def extract_playlist_id(url):
-    # ... (extract_playlist_id remains the same)
-    patterns = [ r'list=([a-zA-Z0-9_-]+)' ]
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match: return match.group(1)
+    match = PLAYLIST_ID_RE.search(url)
+    if match: return match.group(1)
     logging.error(f"Could not extract Playlist ID from URL: {url}")
     print(f"Error: Could not find a valid YouTube Playlist ID in URL: {url}\nEnsure the URL contains 'list=PLAYLIST_ID'.")
     return None
 
-def update_playlist_summary_log(video_details, raw_playlist_title, cleaned_playlist_name, summary_filename_stem):
+def update_playlist_summary_log(log_entries, cleaned_playlist_name):
     """
     Creates or updates a playlist-specific log file within that playlist's summary folder.
     The log file will be named using the playlist's name.
+    All entries of a run are prepended at once, in the given (playlist) order.
     """
     try:
         # Use the new naming convention: [playlistname]_playlist_log.md
         playlist_log_path = config.SUMMARIES_DIR / cleaned_playlist_name / f"{cleaned_playlist_name}_playlist_log.md"
 
-        # 1. Prepare the new entry content
-        video_url = video_details.get("videoUrl", "")
-        video_title = video_details.get("title", "Untitled Video")
-        display_text = f"{raw_playlist_title} – {video_title}"
-        
         today_date = datetime.now().strftime("%Y-%m-%d")
-        
-        new_log_block = f"## Processed on {today_date}\n\n"
-        if video_url:
-            new_log_block += f"{video_url}\n"
-        
-        new_log_block += f"[[{summary_filename_stem}|{display_text}]]\n\n"
-        
-        # 2. Read existing content if the file exists
-        existing_content = ""
-        if playlist_log_path.exists():
-            existing_content = playlist_log_path.read_text(encoding="utf-8")
-                
-        # 3. Write the new block, followed by a separator, then the old content
-        with open(playlist_log_path, "w", encoding="utf-8") as f:
-            f.write(new_log_block)
-            if existing_content:
-                f.write("---\n\n")
-                f.write(existing_content)
-        logging.info(f"Updated playlist log: {playlist_log_path.name}")
+
+        # 1. Prepare one block per video
+        new_log_blocks = []
+        for entry in log_entries:
+            display_text = f"{entry.playlist_context} – {entry.video_title}"
+            new_log_block = f"## Processed on {today_date}\n\n"
+            if entry.video_url:
+                new_log_block += f"{entry.video_url}\n"
+            new_log_block += f"[[{entry.summary_filename_stem}|{display_text}]]\n\n"
+            new_log_blocks.append(new_log_block)
+
+        # Playlists running in parallel can share a folder name, so the prepends must not interleave.
+        with _playlist_log_lock:
+            # 2. Write the new blocks, each followed by a separator, then the old content
+            file_utils.prepend_to_file(playlist_log_path, "---\n\n".join(new_log_blocks), separator="---\n\n")
+        logging.info(f"Updated playlist log: {playlist_log_path.name} ({len(new_log_blocks)} entries)")
 
     except Exception as e:
         logging.error(f"Failed to write to playlist log for '{cleaned_playlist_name}': {e}")
         print(f"Warning: Could not update the individual log for playlist '{cleaned_playlist_name}'.")
 
-def process_playlist(playlist_url):
+def _get_thread_youtube_service():
+    """Returns this worker thread's YouTube service; googleapiclient service objects are not thread-safe."""
+    if getattr(_thread_local, "youtube", None) is None:
+        _thread_local.youtube = youtube_utils.build_youtube_service()
+    return _thread_local.youtube
+
+def _process_single_video(video_id, prefetched_details, current_video_num, total_to_process, raw_playlist_title,
+                          cleaned_playlist_name_for_path_and_filename, playlist_transcript_subfolder,
+                          playlist_summary_subfolder, playlist_atomic_notes_subfolder,
+                          chunk_prompt_template, final_prompt_template, atomic_notes_prompt_template,
+                          prompts_available):
+    """
+    Fetches, summarizes and writes the files for one video. Runs on a worker thread.
+    Returns (VideoResult, SummaryLogEntry or None); the caller writes the logs in playlist order.
+    """
+    logging.info(f"--- Processing video {current_video_num}/{total_to_process} (ID: {video_id}) from playlist '{raw_playlist_title}' ---")
+
+    video_details = prefetched_details
+    if not video_details:
+        # Not in the batch response (private/deleted or failed batch) - retry on its own.
+        youtube = _get_thread_youtube_service()
+        video_details = youtube_utils.get_video_details(youtube, video_id) if youtube else None
+    if not video_details:
+        logging.error(f"FAILURE: Could not fetch details for video ID '{video_id}'. Skipped from further processing.")
+        return VideoResult.FAILED, None
+
+    video_title_raw = video_details.get('title', 'untitled_video')
+    filename_core_component = file_utils.generate_filename_component(
+        cleaned_playlist_name_for_path_and_filename, video_id, video_title_raw
+    )
+    
+    transcript_filepath = playlist_transcript_subfolder / f"{filename_core_component}.md"
+    summary_filepath = playlist_summary_subfolder / f"{filename_core_component} – Summary.md"
+    
+    logging.debug("Expected transcript file: %s", transcript_filepath)
+    logging.debug("Expected summary file: %s", summary_filepath)
+    
+    transcript_content = None
+    transcript_available_for_summarization = False
+    transcript_file_up_to_date = False
+
+    try:
+        transcript_content = file_utils.read_transcript_from_file(transcript_filepath)
+        logging.info(f"Transcript file found: {transcript_filepath.name}.")
+        if transcript_content is not None:
+            transcript_available_for_summarization = True
+            transcript_file_up_to_date = True # Rewriting it would reproduce the same file
+        else:
+             logging.warning(f"Could not read content from existing transcript file: {transcript_filepath}. Using placeholder.")
+             transcript_content = "Transcript could not be loaded from existing file. Please paste manually."
+    except FileNotFoundError:
+        # Freshly fetched transcripts are used from memory; the file written below is never read back.
+        logging.info(f"Transcript file not found for {video_id}. Fetching from API...")
+        api_transcript = transcript_utils.get_transcript(video_id)
+        if api_transcript is not None:
+            transcript_content = api_transcript
+            transcript_available_for_summarization = True
+        else:
+            logging.warning(f"Transcript not available via API for video ID '{video_id}'. Using placeholder.")
+            transcript_content = "Transcript could not be fetched from API. Please paste manually if available elsewhere."
+
+    if transcript_file_up_to_date:
+        logging.info(f"Keeping existing transcript file: {transcript_filepath.name}.")
+    elif not file_utils.create_transcript_file(video_details, transcript_content, transcript_filepath):
+        logging.error(f"FAILURE: Could not create transcript file at {transcript_filepath}. Skipping this video.")
+        return VideoResult.FAILED, None
+    
+    summary_content = None
+    ai_metadata = {}
+    is_placeholder_summary = False
+
+    if not prompts_available:
+        logging.warning(f"Prompts not loaded. Skipping AI summarization for {video_id}.")
+        summary_content = "Summary generation skipped: AI Prompts missing."
+        is_placeholder_summary = True
+    elif not transcript_available_for_summarization:
+        logging.info(f"Transcript for video ID '{video_id}' is a placeholder. Skipping AI summarization.")
+        summary_content = "Summary not generated: Transcript was unavailable or could not be loaded."
+        is_placeholder_summary = True
+    else:
+        logging.info(f"Generating AI summary for video ID '{video_id}'...")
+        result = ai_utils.summarize_transcript(
+            transcript_content, chunk_prompt_template, final_prompt_template, video_title_raw
+        )
+        if result is not None:
+            summary_content = result.get("summary", "")
+            ai_metadata = result.get("metadata", {})
+            if not summary_content:
+                logging.error(f"AI summary was empty for video ID '{video_id}'.")
+                summary_content = "AI summary generation returned empty content."
+                is_placeholder_summary = True
+        else:
+            logging.error(f"AI summary generation failed for video ID '{video_id}'.")
+            summary_content = "AI summary generation failed. Please check AI service or logs."
+            is_placeholder_summary = True
+
+    # --- Atomic Notes Generation ---
+    atomic_notes_folder_name = None
+    if atomic_notes_prompt_template and transcript_available_for_summarization and not is_placeholder_summary:
+        logging.info(f"Generating atomic notes for video ID '{video_id}'...")
+        cleaned_video_title = file_utils.clean_filename(video_title_raw)
+        video_atomic_notes_subfolder = playlist_atomic_notes_subfolder / cleaned_video_title
+
+        raw_atomic = ai_utils.generate_atomic_notes(
+            transcript_content, atomic_notes_prompt_template, video_title_raw
+        )
+        if raw_atomic:
+            parsed_notes = ai_utils.parse_atomic_notes(raw_atomic)
+            transcript_filename_stem = filename_core_component
+            summary_filename_stem_for_link = f"{filename_core_component} – Summary"
+            notes_count = file_utils.create_atomic_note_files(
+                parsed_notes, video_details, video_atomic_notes_subfolder,
+                summary_filename_stem_for_link, transcript_filename_stem,
+                raw_playlist_title
+            )
+            if notes_count > 0:
+                atomic_notes_folder_name = cleaned_video_title
+        else:
+            logging.warning(f"Atomic notes generation returned no result for video ID '{video_id}'.")
+
+    if file_utils.create_summary_file(video_details, summary_content, summary_filepath, filename_core_component, raw_playlist_title, ai_metadata, atomic_notes_folder_name):
+        logging.info(f"Video {video_id} processed. Transcript and Summary files created/updated at {summary_filepath.parent}")
+        summary_filename_stem = summary_filepath.stem
+        
+        link_path_for_master_log = f"summaries/{cleaned_playlist_name_for_path_and_filename}/{summary_filename_stem}"
+        log_entry = SummaryLogEntry(
+            link_target=link_path_for_master_log,
+            video_title=video_title_raw,
+            playlist_context=raw_playlist_title,
+            is_placeholder=is_placeholder_summary,
+            video_url=video_details.get("videoUrl", ""),
+            summary_filename_stem=summary_filename_stem,
+            video_index=current_video_num
+        )
+        return VideoResult.PROCESSED, log_entry
+    else:
+        logging.error(f"FAILURE: Could not create summary file at {summary_filepath}.")
+        return VideoResult.FAILED, None
+
+def process_playlist(playlist_url, youtube=None, playlist_position=0):
     logging.info(f"Attempting to process playlist URL: {playlist_url}")
     playlist_id = extract_playlist_id(playlist_url)
     if not playlist_id: return
@@ -145,7 +314,8 @@ def process_playlist(playlist_url):
         else:
             logging.warning("Could not load taxonomy. Prompt will contain empty taxonomy section.")
 
-    youtube = youtube_utils.build_youtube_service()
+    if youtube is None:
+        youtube = youtube_utils.build_youtube_service()
     if not youtube: return
 
     playlist_details = youtube_utils.get_playlist_details(youtube, playlist_id)
@@ -159,6 +329,11 @@ def process_playlist(playlist_url):
     print(f"Aktuelle Playlist: '{raw_playlist_title}' (Ordner/Dateiname-Präfix: '{cleaned_playlist_name_for_path_and_filename}')")
 
     video_items = youtube_utils.get_playlist_video_items(youtube, playlist_id)
+    if not video_items and not quota_utils.can_spend(quota_utils.YOUTUBE_QUOTA_COSTS["playlistItems.list"]):
+        # Not an empty playlist: the quota ran out before its first page could be fetched.
+        logging.error(f"YouTube API quota exhausted before any video items of playlist '{raw_playlist_title}' were fetched. It will be processed next run.")
+        print(f"YouTube-API-Kontingent aufgebraucht. Playlist '{raw_playlist_title}' wird beim nächsten Lauf verarbeitet.")
+        return
     if not video_items: 
         logging.warning(f"No video items found in playlist '{raw_playlist_title}'.")
         print(f"Warnung: Keine Videos in Playlist '{raw_playlist_title}' gefunden.")
@@ -169,15 +344,22 @@ def process_playlist(playlist_url):
     print(f"{total_videos} Videos in Playlist '{raw_playlist_title}' gefunden.")
     
     print("Checking for existing summaries to avoid redundant API calls...")
-    videos_to_process = []
+    existing_summary_ids = file_utils.get_existing_summary_video_ids(cleaned_playlist_name_for_path_and_filename)
+    # A video added to the playlist twice is counted and processed once (first occurrence).
+    unique_items = {}
     for video_id, playlist_item_id in video_items:
-        if file_utils.check_summary_exists(video_id, cleaned_playlist_name_for_path_and_filename):
-            logging.info(f"Skipping API fetch for video ID '{video_id}' - summary already exists.")
-        else:
-            videos_to_process.append((video_id, playlist_item_id))
+        unique_items.setdefault(video_id, (video_id, playlist_item_id))
+    duplicate_count = total_videos - len(unique_items)
+    if duplicate_count > 0:
+        logging.info(f"Ignoring {duplicate_count} repeated entries of videos listed more than once in playlist '{raw_playlist_title}'.")
+    videos_to_process = [item for video_id, item in unique_items.items() if video_id not in existing_summary_ids]
     
-    skipped_count = total_videos - len(videos_to_process)
+    skipped_ids = [video_id for video_id in unique_items if video_id in existing_summary_ids]
+    skipped_count = len(skipped_ids)
     if skipped_count > 0:
+        # The count at INFO; the full ID list only at DEBUG, as it gets long for mostly processed playlists.
+        logging.info(f"Skipping API fetch for {skipped_count} videos - summary already exists.")
+        logging.debug("Skipped video IDs: %s", ", ".join(skipped_ids))
         print(f"Skipped {skipped_count} videos that have already been processed.")
 
     if not videos_to_process:
@@ -187,143 +369,63 @@ def process_playlist(playlist_url):
 
     processed_count = 0
     failed_to_create_files_count = 0
+    playlist_log_entries = []
     total_to_process = len(videos_to_process)
     
     playlist_transcript_subfolder = config.TRANSCRIPTS_DIR / cleaned_playlist_name_for_path_and_filename
     playlist_summary_subfolder = config.SUMMARIES_DIR / cleaned_playlist_name_for_path_and_filename
     playlist_atomic_notes_subfolder = config.ATOMIC_NOTES_DIR / cleaned_playlist_name_for_path_and_filename
 
-    for index, (video_id, _) in enumerate(videos_to_process):
-        current_video_num = index + 1
-        logging.info(f"--- Processing video {current_video_num}/{total_to_process} (ID: {video_id}) from playlist '{raw_playlist_title}' ---")
-
-        video_details = youtube_utils.get_video_details(youtube, video_id)
-        if not video_details:
-            logging.error(f"FAILURE: Could not fetch details for video ID '{video_id}'. Skipped from further processing.")
-            failed_to_create_files_count += 1
-            continue
-
-        video_title_raw = video_details.get('title', 'untitled_video')
-        filename_core_component = file_utils.generate_filename_component(
-            cleaned_playlist_name_for_path_and_filename, video_id, video_title_raw
-        )
-        
-        transcript_filepath = playlist_transcript_subfolder / f"{filename_core_component}.md"
-        summary_filepath = playlist_summary_subfolder / f"{filename_core_component} – Summary.md"
-        
-        logging.debug(f"Expected transcript file: {transcript_filepath}")
-        logging.debug(f"Expected summary file: {summary_filepath}")
-        
-        transcript_content = None
-        transcript_available_for_summarization = False
-
-        if transcript_filepath.exists():
-            logging.info(f"Transcript file found: {transcript_filepath.name}. Reading...")
-            transcript_content = file_utils.read_transcript_from_file(transcript_filepath)
-            if transcript_content is not None:
-                transcript_available_for_summarization = True
-            else:
-                 logging.warning(f"Could not read content from existing transcript file: {transcript_filepath}. Using placeholder.")
-                 transcript_content = "Transcript could not be loaded from existing file. Please paste manually."
-        else:
-            logging.info(f"Transcript file not found for {video_id}. Fetching from API...")
-            api_transcript = transcript_utils.get_transcript(video_id)
-            if api_transcript is not None:
-                transcript_content = api_transcript
-                transcript_available_for_summarization = True
-            else:
-                logging.warning(f"Transcript not available via API for video ID '{video_id}'. Using placeholder.")
-                transcript_content = "Transcript could not be fetched from API. Please paste manually if available elsewhere."
-
-        if not file_utils.create_transcript_file(video_details, transcript_content, transcript_filepath):
-            logging.error(f"FAILURE: Could not create transcript file at {transcript_filepath}. Skipping this video.")
-            failed_to_create_files_count += 1
-            continue
-        
-        summary_content = None
-        ai_metadata = {}
-        is_placeholder_summary = False
-
-        if not prompts_available:
-            logging.warning(f"Prompts not loaded. Skipping AI summarization for {video_id}.")
-            summary_content = "Summary generation skipped: AI Prompts missing."
-            is_placeholder_summary = True
-        elif not transcript_available_for_summarization:
-            logging.info(f"Transcript for video ID '{video_id}' is a placeholder. Skipping AI summarization.")
-            summary_content = "Summary not generated: Transcript was unavailable or could not be loaded."
-            is_placeholder_summary = True
-        else:
-            logging.info(f"Generating AI summary for video ID '{video_id}'...")
-            result = ai_utils.summarize_transcript(
-                transcript_content, chunk_prompt_template, final_prompt_template, video_title_raw
+    # Videos that already have a transcript file carry their metadata in its front matter;
+    # only the rest is fetched, with one videos.list call per 50 videos.
+    details_by_id = {}
+    existing_transcripts = file_utils.get_existing_transcript_paths(cleaned_playlist_name_for_path_and_filename)
+    for video_id, _ in videos_to_process:
+        if video_id in existing_transcripts:
+            details = file_utils.read_video_details_from_transcript(existing_transcripts[video_id])
+            if details:
+                details_by_id[video_id] = details
+    if details_by_id:
+        logging.info(f"Read details for {len(details_by_id)} videos from existing transcript files.")
+    ids_to_fetch = [video_id for video_id, _ in videos_to_process if video_id not in details_by_id]
+    if ids_to_fetch:
+        details_by_id.update(youtube_utils.get_video_details_batch(youtube, ids_to_fetch))
+
+    # Videos are independent and almost entirely I/O-bound, so they are processed in parallel.
+    with ThreadPoolExecutor(max_workers=config.MAX_WORKERS) as executor:
+        futures = [
+            executor.submit(
+                _process_single_video, video_id, details_by_id.get(video_id), index + 1, total_to_process,
+                raw_playlist_title, cleaned_playlist_name_for_path_and_filename,
+                playlist_transcript_subfolder, playlist_summary_subfolder, playlist_atomic_notes_subfolder,
+                chunk_prompt_template, final_prompt_template, atomic_notes_prompt_template, prompts_available
             )
-            if result is not None:
-                summary_content = result.get("summary", "")
-                ai_metadata = result.get("metadata", {})
-                if not summary_content:
-                    logging.error(f"AI summary was empty for video ID '{video_id}'.")
-                    summary_content = "AI summary generation returned empty content."
-                    is_placeholder_summary = True
+            for index, (video_id, _) in enumerate(videos_to_process)
+        ]
+        for future in as_completed(futures):
+            try:
+                result, log_entry = future.result()
+            except Exception as e:
+                logging.error(f"Unexpected error while processing a video from playlist '{raw_playlist_title}': {e}", exc_info=True)
+                result, log_entry = VideoResult.FAILED, None
+            if result is VideoResult.PROCESSED:
+                processed_count += 1
             else:
-                logging.error(f"AI summary generation failed for video ID '{video_id}'.")
-                summary_content = "AI summary generation failed. Please check AI service or logs."
-                is_placeholder_summary = True
+                failed_to_create_files_count += 1
+            if log_entry is not None:
+                playlist_log_entries.append(log_entry)
 
-        # --- Atomic Notes Generation ---
-        atomic_notes_folder_name = None
-        if atomic_notes_prompt_template and transcript_available_for_summarization and not is_placeholder_summary:
-            logging.info(f"Generating atomic notes for video ID '{video_id}'...")
-            cleaned_video_title = file_utils.clean_filename(video_title_raw)
-            video_atomic_notes_subfolder = playlist_atomic_notes_subfolder / cleaned_video_title
-
-            raw_atomic = ai_utils.generate_atomic_notes(
-                transcript_content, atomic_notes_prompt_template, video_title_raw
-            )
-            if raw_atomic:
-                parsed_notes = ai_utils.parse_atomic_notes(raw_atomic)
-                transcript_filename_stem = filename_core_component
-                summary_filename_stem_for_link = f"{filename_core_component} – Summary"
-                notes_count = file_utils.create_atomic_note_files(
-                    parsed_notes, video_details, video_atomic_notes_subfolder,
-                    summary_filename_stem_for_link, transcript_filename_stem,
-                    raw_playlist_title
-                )
-                if notes_count > 0:
-                    atomic_notes_folder_name = cleaned_video_title
-            else:
-                logging.warning(f"Atomic notes generation returned no result for video ID '{video_id}'.")
-
-        if file_utils.create_summary_file(video_details, summary_content, summary_filepath, filename_core_component, raw_playlist_title, ai_metadata, atomic_notes_folder_name):
-            logging.info(f"Video {video_id} processed. Transcript and Summary files created/updated at {summary_filepath.parent}")
-            processed_count += 1
-
-            summary_filename_stem = summary_filepath.name.removesuffix('.md')
-            
-            link_path_for_master_log = f"summaries/{cleaned_playlist_name_for_path_and_filename}/{summary_filename_stem}"
-            SUMMARIES_LOG_FOR_CURRENT_RUN.append({
-                "link_target": link_path_for_master_log,
-                "video_title": video_title_raw,
-                "playlist_context": raw_playlist_title,
-                "is_placeholder": is_placeholder_summary,
-                "video_url": video_details.get("videoUrl", "")
-            })
-            
-            update_playlist_summary_log(
-                video_details,
-                raw_playlist_title,
-                cleaned_playlist_name_for_path_and_filename,
-                summary_filename_stem
-            )
-        else:
-            logging.error(f"FAILURE: Could not create summary file at {summary_filepath}.")
-            failed_to_create_files_count += 1
-        # Add a cooldown period to avoid being rate-limited
-        time.sleep(5) # Pause for 5 seconds
+    # Workers finish in any order; both logs are written in playlist order once all are done.
+    if playlist_log_entries:
+        playlist_log_entries.sort(key=lambda entry: entry.video_index)
+        update_playlist_summary_log(playlist_log_entries, cleaned_playlist_name_for_path_and_filename)
+        with _summaries_log_lock:
+            SUMMARIES_LOG_FOR_CURRENT_RUN.extend(entry._replace(playlist_position=playlist_position) for entry in playlist_log_entries)
 
     logging.info(f"--- Processing finished for playlist '{raw_playlist_title}' ---")
-    logging.info(f"Stats: Total: {total_videos}, Processed (files created): {processed_count}, Skipped (already exists): {skipped_count}, Failed (file creation issue): {failed_to_create_files_count}")
+    logging.info(f"Stats: Total: {total_videos}, Processed (files created): {processed_count}, Skipped (already exists): {skipped_count}, Duplicates (listed twice): {duplicate_count}, Failed (file creation issue): {failed_to_create_files_count}")
     print(f"\n--- Verarbeitung für Playlist '{raw_playlist_title}' abgeschlossen ---")
-    print(f"Gesamt: {total_videos}, Verarbeitet (Dateien erstellt): {processed_count}, Übersprungen (existierte): {skipped_count}, Kritische Fehler (Dateierstellung): {failed_to_create_files_count}")
+    print(f"Gesamt: {total_videos}, Verarbeitet (Dateien erstellt): {processed_count}, Übersprungen (existierte): {skipped_count}, Duplikate (mehrfach gelistet): {duplicate_count}, Kritische Fehler (Dateierstellung): {failed_to_create_files_count}")
 
 
 def update_master_summary_log():
@@ -336,27 +438,22 @@ def update_master_summary_log():
 
     today_date = datetime.now().strftime("%Y-%m-%d")
     
-    new_entries_md = f"## Processed on {today_date}\n\n"
-    for item in SUMMARIES_LOG_FOR_CURRENT_RUN:
-        video_url = item.get("video_url")
-        link_target = item.get("link_target")
-        display_text = f"{item['playlist_context']} – {item['video_title']}"
+    new_entries_parts = [f"## Processed on {today_date}\n\n"]
+    # Playlists running in parallel finish in any order; the log follows the URL file, then each playlist's order.
+    for item in sorted(SUMMARIES_LOG_FOR_CURRENT_RUN, key=lambda entry: (entry.playlist_position, entry.video_index)):
+        video_url = item.video_url
+        link_target = item.link_target
+        display_text = f"{item.playlist_context} – {item.video_title}"
         
         if video_url:
-            new_entries_md += f"{video_url}\n"
-        new_entries_md += f"[[{link_target}|{display_text}]]\n\n"
-
-    existing_content = ""
-    if master_log_filepath.exists():
-        try:
-            existing_content = master_log_filepath.read_text(encoding="utf-8")
-        except Exception as e:
-            logging.error(f"Error reading existing master summary log {master_log_filepath}: {e}")
+            new_entries_parts.append(f"{video_url}\n")
+        new_entries_parts.append(f"[[{link_target}|{display_text}]]\n\n")
+    new_entries_md = "".join(new_entries_parts)
 
     try:
-        with open(master_log_filepath, "w", encoding="utf-8") as f:
-            f.write(new_entries_md)
-            f.write(existing_content)
+        file_utils.ensure_dir(master_log_filepath.parent)
+        # Newest entries stay on top; the existing log is streamed, not loaded into memory.
+        file_utils.prepend_to_file(master_log_filepath, new_entries_md)
         logging.info(f"Master summary log updated successfully. Added {len(SUMMARIES_LOG_FOR_CURRENT_RUN)} entries.")
         print(f"Master summary log '{master_log_filepath.name}' updated with {len(SUMMARIES_LOG_FOR_CURRENT_RUN)} new entries.")
     except Exception as e:
@@ -365,6 +462,26 @@ def update_master_summary_log():
     
     SUMMARIES_LOG_FOR_CURRENT_RUN.clear()
 
+def _run_playlist_from_file(position, total, playlist_url, youtube, quota_exhausted):
+    """Runs one playlist of the URL file on a playlist worker thread; does nothing once the daily quota is used up."""
+    if quota_exhausted.is_set():
+        return
+    logging.info(f"=== Starting processing for playlist {position}/{total}: {playlist_url} ===")
+    print(f"\n======================================================================")
+    print(f"Starte Verarbeitung für Playlist {position}/{total}: {playlist_url}")
+    print(f"======================================================================")
+    # Each playlist needs at least its details and one page of items; stop cleanly so the next run resumes here.
+    if not quota_utils.can_spend(2):
+        if not quota_exhausted.is_set():
+            quota_exhausted.set()
+            logging.error(f"YouTube API quota exhausted ({quota_utils.remaining_units()} units left). Stopping before playlist {position}.")
+            print("YouTube-API-Kontingent für heute aufgebraucht. Verbleibende Playlists werden beim nächsten Lauf verarbeitet.")
+        return
+    # The shared service object is only safe to use while playlists run one at a time.
+    if config.MAX_CONCURRENT_PLAYLISTS > 1:
+        youtube = _get_thread_youtube_service()
+    process_playlist(playlist_url, youtube, playlist_position=position)
+
 
 if __name__ == "__main__":
     setup_logging() 
@@ -373,9 +490,7 @@ if __name__ == "__main__":
     playlist_urls_from_file = []
     try:
         with open(config.PLAYLIST_URL_FILE, "r", encoding="utf-8") as f:
-            for line in f:
-                url = line.strip()
-                if url and not url.startswith("#"): playlist_urls_from_file.append(url)
+            playlist_urls_from_file = [url for url in (line.strip() for line in f) if url and not url.startswith("#")]
         if not playlist_urls_from_file:
             logging.critical(f"Error: No valid playlist URLs found in '{config.PLAYLIST_URL_FILE}'."); sys.exit(1)
         logging.info(f"{len(playlist_urls_from_file)} playlist URL(s) read.")
@@ -384,12 +499,20 @@ if __name__ == "__main__":
     except Exception as e:
         logging.critical(f"CRITICAL ERROR: Failed to read playlist URL file: {e}", exc_info=True); sys.exit(1)
 
-    for i, playlist_url in enumerate(playlist_urls_from_file):
-        logging.info(f"=== Starting processing for playlist {i+1}/{len(playlist_urls_from_file)}: {playlist_url} ===")
-        print(f"\n======================================================================")
-        print(f"Starte Verarbeitung für Playlist {i+1}/{len(playlist_urls_from_file)}: {playlist_url}")
-        print(f"======================================================================")
-        process_playlist(playlist_url)
+    # One service object for the whole run; worker threads build their own via _get_thread_youtube_service.
+    youtube = youtube_utils.build_youtube_service()
+    if not youtube:
+        logging.critical("CRITICAL ERROR: Could not build YouTube service. Aborting."); sys.exit(1)
+
+    # Playlists share no state besides the locked run log, so up to MAX_CONCURRENT_PLAYLISTS overlap.
+    quota_exhausted = threading.Event()
+    with ThreadPoolExecutor(max_workers=config.MAX_CONCURRENT_PLAYLISTS) as playlist_executor:
+        playlist_futures = [
+            playlist_executor.submit(_run_playlist_from_file, i + 1, len(playlist_urls_from_file), playlist_url, youtube, quota_exhausted)
+            for i, playlist_url in enumerate(playlist_urls_from_file)
+        ]
+        for future in playlist_futures:
+            future.result()
 
     update_master_summary_log()
     logging.info("=== All specified playlists have been processed. Script finished. ===")
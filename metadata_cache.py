@@ -0,0 +1,119 @@
+# === metadata_cache.py - Local cache for YouTube metadata ===
+
+"""
+Caches YouTube video and playlist metadata (and fetched transcripts) in a local SQLite database.
+
+Metadata of a published video (title, channel, duration, ...) practically never
+changes, so re-fetching it on every run only costs API quota. Entries expire after
+VIDEO_DETAILS_TTL_SECONDS / PLAYLIST_DETAILS_TTL_SECONDS so edits on YouTube are
+eventually picked up. One connection is shared by all worker threads and guarded
+by a lock; WAL mode lets other processes read while a run is writing.
+"""
+
+import config
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+# --- Constants ---
+VIDEO_DETAILS_TTL_SECONDS = 7 * 24 * 3600   # Video metadata is refreshed weekly
+PLAYLIST_DETAILS_TTL_SECONDS = 24 * 3600    # Playlist titles are refreshed daily
+TRANSCRIPT_TTL_SECONDS = 30 * 24 * 3600     # Transcripts rarely change once published
+MISSING_TRANSCRIPT_TTL_SECONDS = 24 * 3600  # Disabled/missing transcripts are checked again daily
+_TABLES = ("video_details", "playlist_details", "transcripts", "missing_transcripts")
+
+_connection = None
+_connection_lock = threading.Lock()
+
+
+def _get_connection():
+    """Returns the shared connection, creating the database and tables on first use. Call with the lock held."""
+    global _connection
+    if _connection is None:
+        _connection = sqlite3.connect(config.METADATA_CACHE_FILE, check_same_thread=False)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        for table in _TABLES:
+            _connection.execute(f"CREATE TABLE IF NOT EXISTS {table} (id TEXT PRIMARY KEY, json TEXT NOT NULL, fetched_at INTEGER NOT NULL)")
+        _connection.commit()
+    return _connection
+
+def _get_many(table, ids, ttl_seconds):
+    """Returns {id: data} for every id in `table` that was fetched within the last ttl_seconds."""
+    if not ids:
+        return {}
+    oldest_allowed = int(time.time()) - ttl_seconds
+    found = {}
+    try:
+        with _connection_lock:
+            connection = _get_connection()
+            # Query in slices to stay below SQLite's limit on bound parameters.
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = connection.execute(
+                    f"SELECT id, json FROM {table} WHERE fetched_at >= ? AND id IN ({placeholders})",
+                    [oldest_allowed, *batch],
+                ).fetchall()
+                found.update((row_id, json.loads(data)) for row_id, data in rows)
+    except Exception as e:
+        logging.warning(f"Metadata cache lookup in '{table}' failed: {e}")
+        return {}
+    return found
+
+def _put_many(table, items):
+    """Stores {id: data} entries in `table`, stamped with the current time."""
+    if not items:
+        return
+    now = int(time.time())
+    try:
+        with _connection_lock:
+            connection = _get_connection()
+            connection.executemany(
+                f"INSERT OR REPLACE INTO {table} (id, json, fetched_at) VALUES (?, ?, ?)",
+                [(item_id, json.dumps(data, ensure_ascii=False), now) for item_id, data in items.items()],
+            )
+            connection.commit()
+    except Exception as e:
+        logging.warning(f"Metadata cache write to '{table}' failed: {e}")
+
+# --- Video Details ---
+
+def get_video_details(video_ids):
+    """Returns cached, unexpired details for the given video IDs as {video_id: details}."""
+    return _get_many("video_details", list(video_ids), VIDEO_DETAILS_TTL_SECONDS)
+
+def put_video_details(details_by_id):
+    """Caches freshly fetched video details, given as {video_id: details}."""
+    _put_many("video_details", details_by_id)
+
+# --- Playlist Details ---
+
+def get_playlist_details(playlist_id):
+    """Returns cached, unexpired details for a playlist, or None."""
+    return _get_many("playlist_details", [playlist_id], PLAYLIST_DETAILS_TTL_SECONDS).get(playlist_id)
+
+def put_playlist_details(playlist_id, details):
+    """Caches freshly fetched playlist details."""
+    _put_many("playlist_details", {playlist_id: details})
+
+# --- Transcripts ---
+# Keyed by video ID and language preference, independent of the playlist folder, so a video
+# that shows up in another (or a renamed) playlist is not fetched from YouTube again.
+
+def get_transcript(cache_key):
+    """Returns a cached, unexpired transcript text, or None."""
+    return _get_many("transcripts", [cache_key], TRANSCRIPT_TTL_SECONDS).get(cache_key)
+
+def put_transcript(cache_key, transcript):
+    """Caches a freshly fetched transcript text."""
+    _put_many("transcripts", {cache_key: transcript})
+
+def get_missing_transcript(cache_key):
+    """Returns the reason a transcript was unavailable when last checked (within the TTL), or None."""
+    return _get_many("missing_transcripts", [cache_key], MISSING_TRANSCRIPT_TTL_SECONDS).get(cache_key)
+
+def put_missing_transcript(cache_key, reason):
+    """Remembers that a video has no usable transcript, e.g. reason "disabled" or "not found"."""
+    _put_many("missing_transcripts", {cache_key: reason})
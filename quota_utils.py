@@ -0,0 +1,94 @@
+# === quota_utils.py - YouTube Data API quota tracking ===
+
+"""
+Keeps a persistent count of YouTube Data API quota units spent today.
+
+The API allows a fixed number of units per day (10,000 by default) and resets at
+midnight Pacific Time. Every call is reserved here before it is executed, so a
+long multi-playlist run stops cleanly once the budget is used up instead of
+failing with 403 errors halfway through. Usage is stored in a small JSON file so
+the count survives across runs on the same day.
+"""
+
+import config
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+# --- Constants ---
+# Unit cost per endpoint, see https://developers.google.com/youtube/v3/determine_quota_cost
+YOUTUBE_QUOTA_COSTS = {
+    "videos.list": 1,
+    "playlistItems.list": 1,
+    "playlists.list": 1,
+    "search.list": 100,
+}
+QUOTA_RESET_TIMEZONE = ZoneInfo("America/Los_Angeles") # Quota days follow Pacific Time
+
+_quota_lock = threading.Lock()
+_usage = None # Loaded lazily: {"date": "YYYY-MM-DD", "used": int, "operations": {op: units}}
+
+
+def _quota_day():
+    """Returns today's date in the quota's (Pacific) timezone as an ISO string."""
+    return datetime.now(QUOTA_RESET_TIMEZONE).date().isoformat()
+
+def _load_usage():
+    """Returns today's usage record, reading the JSON file on first use and resetting it on a new quota day."""
+    global _usage
+    today = _quota_day()
+    if _usage is None:
+        try:
+            _usage = json.loads(config.QUOTA_USAGE_FILE.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            _usage = {}
+        except Exception as e:
+            logging.warning(f"Could not read quota usage file {config.QUOTA_USAGE_FILE}: {e}. Starting from zero.")
+            _usage = {}
+    if _usage.get("date") != today:
+        _usage = {"date": today, "used": 0, "operations": {}}
+    return _usage
+
+def _save_usage(usage):
+    """Writes the usage record via a temp file so an interrupted run never leaves a truncated file."""
+    tmp_path = config.QUOTA_USAGE_FILE.with_name(config.QUOTA_USAGE_FILE.name + ".tmp")
+    try:
+        tmp_path.write_text(json.dumps(usage, indent=2), encoding="utf-8")
+        os.replace(tmp_path, config.QUOTA_USAGE_FILE)
+    except Exception as e:
+        logging.warning(f"Could not save quota usage to {config.QUOTA_USAGE_FILE}: {e}")
+
+def remaining_units():
+    """Returns how many quota units are left today."""
+    with _quota_lock:
+        return config.YOUTUBE_DAILY_QUOTA - _load_usage()["used"]
+
+def can_spend(units):
+    """Returns True if `units` can be spent today without dipping into the reserve."""
+    return remaining_units() - units >= config.YOUTUBE_QUOTA_RESERVE
+
+def reserve(operation):
+    """
+    Records the cost of one API call before it is executed.
+
+    Args:
+        operation (str): The endpoint name, e.g. "videos.list".
+
+    Returns:
+        bool: True if the call may proceed; False if it would exceed today's budget
+              (nothing is recorded in that case).
+    """
+    units = YOUTUBE_QUOTA_COSTS.get(operation, 1)
+    with _quota_lock:
+        usage = _load_usage()
+        if config.YOUTUBE_DAILY_QUOTA - usage["used"] - units < config.YOUTUBE_QUOTA_RESERVE:
+            logging.error(f"YouTube API quota exhausted: {operation} needs {units} units, "
+                          f"{config.YOUTUBE_DAILY_QUOTA - usage['used']} left (reserve {config.YOUTUBE_QUOTA_RESERVE}).")
+            return False
+        usage["used"] += units
+        usage["operations"][operation] = usage["operations"].get(operation, 0) + units
+        _save_usage(usage)
+        return True
@@ -2,6 +2,7 @@ import os
 import re
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import config       # To access TRANSCRIPTS_DIR, SUMMARIES_DIR, BASE_DIR
 import file_utils   # To access clean_filename
@@ -33,14 +34,21 @@ OLD_SUMMARY_REGEX = re.compile(r"([a-zA-Z0-9_-]{11})_(.*)_summary\.md")
 # Regex to extract playlist name from summary content: **Playlist:** [[Playlist ActualName]]
 PLAYLIST_LINE_REGEX = re.compile(r"\*\*Playlist:\*\* \[\[Playlist (.*?)\]\]")
 
-def get_playlist_from_summary_content(summary_filepath_obj):
-    """Reads a summary file and extracts the playlist name."""
+# Files are independent within a pass and the work is pure file I/O, so threads overlap it.
+RENAME_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+def list_markdown_files(directory):
+    """Returns the .md files directly inside a directory. scandir's cached file type spares a stat() per entry; order doesn't matter."""
+    with os.scandir(directory) as entries:
+        return [Path(entry.path) for entry in entries if entry.name.endswith(".md") and entry.is_file()]
+
+def get_playlist_from_summary_content(summary_filepath_obj, content):
+    """Extracts the playlist name from a summary file's already-read content."""
     try:
-        content = summary_filepath_obj.read_text(encoding="utf-8")
         match = PLAYLIST_LINE_REGEX.search(content)
         if match:
             playlist_name = match.group(1).strip()
-            logging.debug(f"Extracted playlist '{playlist_name}' from {summary_filepath_obj.name}")
+            logging.debug("Extracted playlist '%s' from %s", playlist_name, summary_filepath_obj.name)
             return playlist_name
         else:
             logging.warning(f"Playlist line not found in {summary_filepath_obj.name}")
@@ -63,7 +71,13 @@ def process_summary_file(summary_filepath_obj, video_id_to_playlist_map, is_dry_
     old_title_part_with_underscores = match.group(2)
     title_part_with_spaces = old_title_part_with_underscores.replace('_', ' ') # Convert underscores to spaces for the new title
 
-    extracted_playlist_name_raw = get_playlist_from_summary_content(summary_filepath_obj)
+    # Read once: the same content serves the playlist lookup and the link update below.
+    try:
+        content = summary_filepath_obj.read_text(encoding="utf-8")
+    except Exception as e:
+        logging.error(f"Error reading or parsing playlist from {old_filename}: {e}")
+        content = None
+    extracted_playlist_name_raw = get_playlist_from_summary_content(summary_filepath_obj, content) if content is not None else None
     if not extracted_playlist_name_raw:
         logging.warning(f"No playlist name found in content of {old_filename}. Using 'Unknown Playlist'.")
         extracted_playlist_name_raw = "Unknown Playlist"
@@ -98,12 +112,14 @@ def process_summary_file(summary_filepath_obj, video_id_to_playlist_map, is_dry_
             # New link target is [[PlaylistName – TitleWithSpaces – VIDEOID]]
             new_link_target_basename = f"{cleaned_playlist_name_for_file} – {title_part_with_spaces} – {video_id}"
             
-            content = temp_path_for_read_write.read_text(encoding="utf-8")
-            old_link_pattern = re.compile(r"\[\[" + re.escape(old_link_target_basename) + r"\]\]")
+            if content is None: # The first read failed; try once more now
+                content = temp_path_for_read_write.read_text(encoding="utf-8")
+            # A literal substitution: no per-file regex compile, and no escape handling in the new name.
+            old_link_string = f"[[{old_link_target_basename}]]"
             new_link_string = f"[[{new_link_target_basename}]]"
 
-            if old_link_pattern.search(content):
-                updated_content = old_link_pattern.sub(new_link_string, content)
+            if old_link_string in content:
+                updated_content = content.replace(old_link_string, new_link_string)
                 if updated_content != content:
                     temp_path_for_read_write.write_text(updated_content, encoding="utf-8")
                     logging.info(f"    SUCCESS: Internal link updated to point to '[[{new_link_target_basename}]]'.")
@@ -200,12 +216,14 @@ if __name__ == "__main__":
     logging.info("--- Starting Pass 1: Processing Summary Files ---")
     print("\n--- Processing Summary Files ---")
     if config.SUMMARIES_DIR.exists() and config.SUMMARIES_DIR.is_dir():
-        for filepath_obj in sorted(config.SUMMARIES_DIR.iterdir()): 
-            if filepath_obj.is_file() and filepath_obj.name.endswith(".md"):
-                result = process_summary_file(filepath_obj, video_id_to_playlist_name, is_dry_run)
-                if result == True or result == "dry_run_success": summary_processed_count += 1
-                elif result == "skipped": summary_skipped_count += 1
-                else: summary_error_count += 1
+        summary_files = list_markdown_files(config.SUMMARIES_DIR)
+        # Workers only add single keys to video_id_to_playlist_name, which is atomic for a dict.
+        with ThreadPoolExecutor(max_workers=RENAME_WORKERS) as executor:
+            results = list(executor.map(lambda fp: process_summary_file(fp, video_id_to_playlist_name, is_dry_run), summary_files))
+        for result in results:
+            if result == True or result == "dry_run_success": summary_processed_count += 1
+            elif result == "skipped": summary_skipped_count += 1
+            else: summary_error_count += 1
     else:
         logging.warning(f"Summaries directory not found or is not a directory: {config.SUMMARIES_DIR}")
         print(f"Warning: Summaries directory not found: {config.SUMMARIES_DIR}")
@@ -218,12 +236,14 @@ if __name__ == "__main__":
     logging.info("--- Starting Pass 2: Processing Transcript Files ---")
     print("\n--- Processing Transcript Files ---")
     if config.TRANSCRIPTS_DIR.exists() and config.TRANSCRIPTS_DIR.is_dir():
-        for filepath_obj in sorted(config.TRANSCRIPTS_DIR.iterdir()):
-            if filepath_obj.is_file() and filepath_obj.name.endswith(".md"):
-                result = process_transcript_file(filepath_obj, video_id_to_playlist_name, is_dry_run)
-                if result == True or result == "dry_run_success": transcript_processed_count +=1
-                elif result == "skipped": transcript_skipped_count += 1
-                else: transcript_error_count += 1
+        transcript_files = list_markdown_files(config.TRANSCRIPTS_DIR)
+        # Pass 2 only reads the playlist map built by Pass 1.
+        with ThreadPoolExecutor(max_workers=RENAME_WORKERS) as executor:
+            results = list(executor.map(lambda fp: process_transcript_file(fp, video_id_to_playlist_name, is_dry_run), transcript_files))
+        for result in results:
+            if result == True or result == "dry_run_success": transcript_processed_count +=1
+            elif result == "skipped": transcript_skipped_count += 1
+            else: transcript_error_count += 1
     else:
         logging.warning(f"Transcripts directory not found or is not a directory: {config.TRANSCRIPTS_DIR}")
         print(f"Warning: Transcripts directory not found: {config.TRANSCRIPTS_DIR}")
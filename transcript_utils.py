@@ -1,13 +1,82 @@
 import logging
-from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
-from youtube_transcript_api.proxies import WebshareProxyConfig
+import random
+import re
+import threading
+import time
+from operator import attrgetter
 import config # To get proxy credentials
+import metadata_cache # For reusing transcripts fetched in earlier runs
+# youtube_transcript_api is imported inside get_transcript: runs that only reuse
+# transcript files already on disk never pay for loading it.
 
-def get_transcript(video_id):
+# --- Constants ---
+PREFERRED_LANGUAGES = ['de', 'en'] # Tried in this order
+TRANSCRIPT_FETCH_RETRIES = 3        # Extra attempts after a recoverable failure
+TRANSCRIPT_RETRY_BASE_DELAY = 1.0   # Seconds before the first retry, doubled for each further one
+TRANSCRIPT_RETRY_MAX_DELAY = 30.0   # Upper bound for a single backoff
+TRANSCRIPT_FETCH_DEADLINE = 60.0    # Seconds after which no further retry is started for a video
+VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$') # YouTube video IDs are always 11 URL-safe characters
+
+_thread_local = threading.local()
+_transcript_rate_limit_lock = threading.Lock()
+_transcript_next_request_time = 0.0
+
+
+def _get_thread_transcript_api():
+    """
+    Returns this worker thread's YouTubeTranscriptApi, creating it (and its requests.Session,
+    proxy settings and retry adapters) on first use. The library documents its client as not
+    thread-safe, so there is one per thread rather than one per process.
+
+    Keep-alive stays off: the library sends 'Connection: close' for the rotating Webshare proxy
+    so every request leaves through a fresh IP.
+    """
+    if getattr(_thread_local, "ytt_api", None) is None:
+        from youtube_transcript_api import YouTubeTranscriptApi
+        from youtube_transcript_api.proxies import WebshareProxyConfig
+        # --- Configure the Proxy ---
+        proxy_config = WebshareProxyConfig(
+            proxy_username=config.PROXY_USERNAME,
+            proxy_password=config.PROXY_PASSWORD
+        )
+        # --- Initialize the API with the Proxy Configuration ---
+        # The library now knows to send all requests through your proxy.
+        _thread_local.ytt_api = YouTubeTranscriptApi(proxy_config=proxy_config)
+    return _thread_local.ytt_api
+
+def _wait_for_transcript_rate_limit():
+    """Spaces out transcript requests so all workers together send at most one per TRANSCRIPT_MIN_INTERVAL_SECONDS."""
+    global _transcript_next_request_time
+    if config.TRANSCRIPT_MIN_INTERVAL_SECONDS <= 0:
+        return
+    with _transcript_rate_limit_lock:
+        now = time.monotonic()
+        wait = _transcript_next_request_time - now
+        _transcript_next_request_time = max(now, _transcript_next_request_time) + config.TRANSCRIPT_MIN_INTERVAL_SECONDS
+    if wait > 0:
+        time.sleep(wait)
+
+def get_transcript(video_id, deadline_s=TRANSCRIPT_FETCH_DEADLINE):
     """
     Fetches a transcript using a rotating residential proxy to bypass YouTube's
     strict rate limiting, as recommended by the library author.
+    Transcripts fetched in earlier runs are served from the local metadata cache.
+    Retries stop once another backoff would end after `deadline_s` seconds.
     """
+    if not isinstance(video_id, str) or not VIDEO_ID_RE.match(video_id):
+        logging.warning(f"Invalid video ID {video_id!r}, not fetching a transcript.")
+        return None
+
+    cache_key = f"{video_id}:{','.join(PREFERRED_LANGUAGES)}"
+    cached_transcript = metadata_cache.get_transcript(cache_key)
+    if cached_transcript is not None:
+        logging.info(f"Using cached transcript for {video_id}.")
+        return cached_transcript
+    missing_reason = metadata_cache.get_missing_transcript(cache_key)
+    if missing_reason is not None:
+        logging.info(f"Skipping transcript fetch for {video_id}: transcript {missing_reason} when last checked.")
+        return None
+
     logging.info(f"Attempting to fetch transcript for {video_id} using Webshare proxy.")
 
     # --- Check for Proxy Credentials ---
@@ -16,40 +85,63 @@ def get_transcript(video_id):
         print("Error: Proxy credentials are not set in your .env file. Transcript fetching will fail.")
         return None
 
-    try:
-        # --- Configure the Proxy ---
-        proxy_config = WebshareProxyConfig(
-            proxy_username=config.PROXY_USERNAME,
-            proxy_password=config.PROXY_PASSWORD
-        )
+    from xml.etree.ElementTree import ParseError
+    from requests import RequestException
+    from youtube_transcript_api import (TranscriptsDisabled, NoTranscriptFound, RequestBlocked,
+                                        YouTubeRequestFailed, YouTubeDataUnparsable)
+    # Failures that another attempt (through a fresh proxy IP) can fix. Anything else - an
+    # unavailable, private or age-restricted video, or a bug - fails the same way every time.
+    retriable_errors = (RequestException, ParseError, RequestBlocked, YouTubeRequestFailed, YouTubeDataUnparsable)
+    started_at = time.monotonic()
 
-        # --- Initialize the API with the Proxy Configuration ---
-        # The library now knows to send all requests through your proxy.
-        ytt_api = YouTubeTranscriptApi(proxy_config=proxy_config)
-
-        # --- Fetch the transcript using the modern .fetch() method ---
-        # As confirmed in the GitHub issue, a direct fetch is more reliable with a proxy.
-        preferred_langs = ['de', 'en']
-        fetched_transcript_object = ytt_api.fetch(video_id, languages=preferred_langs)
-        
-        logging.info(f"SUCCESS: Fetched transcript for {video_id} using proxy.")
-        print(f"Successfully fetched transcript for video: {video_id} (Proxy Method)")
-        
-        # Convert the fetched transcript object into the simple text format our script needs.
-        transcript_segments = fetched_transcript_object.to_raw_data()
-        full_transcript = " ".join([segment['text'] for segment in transcript_segments])
-        return full_transcript
-
-    except TranscriptsDisabled:
-        logging.warning(f"Transcripts are disabled for video {video_id}.")
-        print(f"Warning: Transcripts are disabled for video {video_id}.")
-        return None
-    except NoTranscriptFound:
-        logging.warning(f"No transcript found in preferred languages ('de', 'en') for {video_id}, even with proxy.")
-        print(f"Warning: No German or English transcript found for {video_id}.")
-        return None
-    except Exception as e:
-        # This will catch other errors, such as an invalid proxy login.
-        logging.error(f"An unexpected error occurred while fetching transcript with proxy for {video_id}: {e}", exc_info=True)
-        print(f"Error: An error occurred with the proxy or API: {e}")
-        return None
\ No newline at end of file
+    for attempt in range(TRANSCRIPT_FETCH_RETRIES + 1):
+        try:
+            ytt_api = _get_thread_transcript_api()
+            _wait_for_transcript_rate_limit()
+
+            # --- Fetch the transcript using the modern .fetch() method ---
+            # As confirmed in the GitHub issue, a direct fetch is more reliable with a proxy.
+            fetched_transcript_object = ytt_api.fetch(video_id, languages=PREFERRED_LANGUAGES)
+            
+            # The fetched object already names its language; no second lookup needed to log it.
+            logging.info(f"SUCCESS: Fetched transcript for {video_id} ({fetched_transcript_object.language_code}, "
+                         f"{'generated' if fetched_transcript_object.is_generated else 'manual'}) using proxy.")
+            
+            # Convert the fetched transcript object into the simple text format our script needs.
+            # Joining the snippets' text directly skips to_raw_data()'s list of per-snippet dicts.
+            full_transcript = " ".join(map(attrgetter("text"), fetched_transcript_object))
+            metadata_cache.put_transcript(cache_key, full_transcript)
+            return full_transcript
+
+        # Unrecoverable: retrying can't change the answer.
+        except TranscriptsDisabled:
+            metadata_cache.put_missing_transcript(cache_key, "disabled")
+            logging.warning(f"Transcripts are disabled for video {video_id}.")
+            print(f"Warning: Transcripts are disabled for video {video_id}.")
+            return None
+        except NoTranscriptFound:
+            metadata_cache.put_missing_transcript(cache_key, "not found")
+            logging.warning(f"No transcript found in preferred languages ('de', 'en') for {video_id}, even with proxy.")
+            print(f"Warning: No German or English transcript found for {video_id}.")
+            return None
+        # Recoverable: network errors, blocked requests, parse errors of a truncated response.
+        except retriable_errors as e:
+            if attempt == TRANSCRIPT_FETCH_RETRIES:
+                # This will catch other errors, such as an invalid proxy login.
+                logging.error(f"An unexpected error occurred while fetching transcript with proxy for {video_id}: {e}", exc_info=True)
+                print(f"Error: An error occurred with the proxy or API: {e}")
+                return None
+            # Back off only after a failure: exponential with jitter, capped.
+            delay = min(TRANSCRIPT_RETRY_MAX_DELAY, TRANSCRIPT_RETRY_BASE_DELAY * 2 ** attempt * (1 + random.random() * 0.5))
+            if time.monotonic() - started_at + delay > deadline_s:
+                logging.error(f"Giving up on transcript for {video_id} after {attempt + 1} attempts: "
+                              f"retrying would exceed the {deadline_s:.0f}s deadline. Last error: {e}")
+                print(f"Error: An error occurred with the proxy or API: {e}")
+                return None
+            logging.warning(f"Transcript fetch for {video_id} failed ({e}). Retrying in {delay:.1f}s...")
+            time.sleep(delay)
+        # Permanent: no retry, no sleep.
+        except Exception as e:
+            logging.error(f"Transcript for {video_id} could not be fetched: {e}", exc_info=True)
+            print(f"Error: An error occurred with the proxy or API: {e}")
+            return None
@@ -13,18 +13,25 @@ for building an authenticated service is included but not implemented.
 
 import config  # For YOUTUBE_API_KEY
 import logging # For logging errors
+import quota_utils # For tracking the daily API quota
+import metadata_cache # For reusing metadata fetched in earlier runs
 
-# Import necessary Google API client library components
-from googleapiclient.discovery import build
+# Only the light errors module is imported up front; the discovery machinery (httplib2, google-auth,
+# uritemplate, the bundled discovery document) is loaded by build_youtube_service when a service is needed.
 from googleapiclient.errors import HttpError
 
-# --- Initial Check for API Key ---
-# Stop immediately if the essential API key is missing from configuration.
-if not config.YOUTUBE_API_KEY:
-    # Raising an error might be preferable to just logging, as the module is unusable without a key.
-    error_msg = "YouTube API Key not found. Please set YOUTUBE_API_KEY in your .env file."
-    logging.critical(error_msg)
-    raise ValueError(error_msg)
+# --- Constants ---
+VIDEOS_LIST_MAX_IDS = 50 # Maximum number of IDs the videos.list endpoint accepts per request
+# Partial response for videos.list: only what _build_video_details reads (drops thumbnails, tags, localizations, ...)
+VIDEO_DETAILS_FIELDS = "items(id,snippet(title,description,publishedAt,channelTitle,channelId),contentDetails/duration)"
+PLAYLIST_ITEMS_FIELDS = "nextPageToken,items(id,contentDetails/videoId)"
+PLAYLIST_DETAILS_FIELDS = "items(snippet/title)"
+YOUTUBE_HTTP_TIMEOUT_SECONDS = 30 # Socket timeout for YouTube API calls
+# Retries of a failed call on 429/5xx and connection errors; the client library backs off
+# exponentially with jitter between attempts. Each retry is billed again but quota_utils counts
+# the call once; config.YOUTUBE_QUOTA_RESERVE must absorb the difference.
+YOUTUBE_API_RETRIES = 4
+HTTP_BATCH_MAX_REQUESTS = 50 # videos.list calls packed into one HTTP batch request (Google's recommended upper bound)
 
 # --- YouTube Service Builders ---
 
@@ -38,10 +45,24 @@ def build_youtube_service():
         googleapiclient.discovery.Resource | None: The YouTube service object,
                                                  or None if building the service fails.
     """
+    # --- Check for API Key ---
+    # Checked here rather than at import, so modules importing this one work without a key.
+    if not config.YOUTUBE_API_KEY:
+        logging.critical("YouTube API Key not found. Please set YOUTUBE_API_KEY in your .env file.")
+        print("Error: YOUTUBE_API_KEY is not set in your .env file. Could not build YouTube service.")
+        return None
+
     try:
+        import httplib2 # HTTP transport of the Google API client
+        from googleapiclient.discovery import build
         # Build the service resource object.
         # Arguments: API name ('youtube'), API version ('v3'), developerKey (your API key).
-        youtube_service = build('youtube', 'v3', developerKey=config.YOUTUBE_API_KEY)
+        # static_discovery uses the discovery document bundled with the client library instead of downloading it.
+        # The service keeps its own Http object, whose keep-alive connection is reused by every later
+        # .execute(); it is not thread-safe, hence one service per worker thread in main.py.
+        youtube_service = build('youtube', 'v3', developerKey=config.YOUTUBE_API_KEY,
+                                http=httplib2.Http(timeout=YOUTUBE_HTTP_TIMEOUT_SECONDS),
+                                static_discovery=True, cache_discovery=False)
         logging.info("YouTube API service (read-only) created successfully.")
         print("YouTube service created successfully.") # User feedback
         return youtube_service
@@ -88,7 +109,8 @@ def get_playlist_video_items(youtube_service, playlist_id):
     Returns:
         list[tuple[str, str]]: A list of tuples, where each tuple is (video_id, playlist_item_id).
                                 Returns an empty list if an error occurs, the playlist is empty,
-                                or the service object is invalid.
+                                or the service object is invalid. If the daily quota runs out
+                                midway, the items of the pages fetched so far are returned.
     """
     # Validate the service object input
     if not youtube_service:
@@ -96,23 +118,29 @@ def get_playlist_video_items(youtube_service, playlist_id):
         return []
 
     video_items = []
-    next_page_token = None # Initialize page token for pagination
 
     logging.info(f"Fetching video items from playlist: {playlist_id}...")
     print(f"Fetching videos from playlist: {playlist_id}...") # User feedback
 
     try:
-        # Loop until all pages of results have been fetched
-        while True:
-            # Construct the API request for playlist items
-            request = youtube_service.playlistItems().list(
-                part="contentDetails,id", # Request 'contentDetails' for videoId, 'id' for playlistItemId
-                playlistId=playlist_id,
-                maxResults=50,          # Request the maximum allowed items per page
-                pageToken=next_page_token # Provide the token for the next page (if any)
-            )
+        playlist_items = youtube_service.playlistItems()
+        # Construct the API request for the first page of playlist items
+        request = playlist_items.list(
+            part="contentDetails,id", # Request 'contentDetails' for videoId, 'id' for playlistItemId
+            playlistId=playlist_id,
+            maxResults=50,          # Request the maximum allowed items per page
+            fields=PLAYLIST_ITEMS_FIELDS # Only the IDs and the paging token
+        )
+        # Loop until all pages of results have been fetched; list_next() returns None after the last page
+        while request is not None:
+            # Stop before the call if today's quota is used up. The pages already fetched (and paid for)
+            # are still returned; the next run picks up the rest of the playlist.
+            if not quota_utils.reserve("playlistItems.list"):
+                logging.warning(f"YouTube API quota exhausted after {len(video_items)} video items of playlist {playlist_id}. Returning a partial list.")
+                print(f"YouTube API quota exhausted. Continuing with the {len(video_items)} videos fetched so far; the rest follows next run.")
+                return video_items
             # Execute the request
-            response = request.execute()
+            response = request.execute(num_retries=YOUTUBE_API_RETRIES)
 
             # Process the items found on the current page
             for item in response.get("items", []):
@@ -124,11 +152,8 @@ def get_playlist_video_items(youtube_service, playlist_id):
                 if video_id and playlist_item_id:
                     video_items.append((video_id, playlist_item_id))
 
-            # Get the token for the *next* page of results
-            next_page_token = response.get("nextPageToken")
-            # If there's no next page token, we've fetched all items, exit the loop
-            if not next_page_token:
-                break
+            # Same request with the response's nextPageToken filled in
+            request = playlist_items.list_next(request, response)
 
         logging.info(f"Found {len(video_items)} video items in playlist {playlist_id}.")
         print(f"Found {len(video_items)} videos in the playlist.") # User feedback
@@ -147,6 +172,31 @@ def get_playlist_video_items(youtube_service, playlist_id):
         print(f"An unexpected error occurred while fetching playlist items: {e}")
         return []
 
+def _build_video_details(video_item, video_id):
+    """
+    Assembles the details dictionary we care about from a `videos.list` item.
+
+    Args:
+        video_item (dict): One entry of the API response's "items" list.
+        video_id (str): The ID of the video the item belongs to.
+
+    Returns:
+        dict: Video metadata (title, description, channel, dates, duration, URL).
+    """
+    snippet = video_item.get("snippet", {})           # Safely get snippet dict
+    content_details = video_item.get("contentDetails", {}) # Safely get contentDetails dict
+
+    return {
+        "title": snippet.get("title", "No Title Provided"),
+        "description": snippet.get("description", ""),
+        "publishedAt": snippet.get("publishedAt"), # ISO 8601 format timestamp (string)
+        "channelTitle": snippet.get("channelTitle", "Unknown Channel"),
+        "channelId": snippet.get("channelId"),       # Added based on previous request
+        "duration": content_details.get("duration"), # ISO 8601 duration format (string, e.g., "PT11M58S")
+        "videoId": video_id,                     # Include the ID itself for convenience
+        "videoUrl": f"https://www.youtube.com/watch?v={video_id}" # Standard watch URL
+    }
+
 def get_video_details(youtube_service, video_id):
     """
     Fetches detailed metadata for a specific video ID.
@@ -166,17 +216,27 @@ def get_video_details(youtube_service, video_id):
         logging.error("get_video_details called with an invalid YouTube service object.")
         return None
 
+    cached_details = metadata_cache.get_video_details([video_id]).get(video_id)
+    if cached_details:
+        logging.info(f"Using cached details for video '{cached_details['title']}' ({video_id}).")
+        return cached_details
+
     logging.info(f"Fetching details for video ID: {video_id}...")
     print(f"Fetching details for video: {video_id}...") # User feedback
 
+    if not quota_utils.reserve("videos.list"):
+        print(f"YouTube API quota exhausted. Skipping details for video {video_id}.")
+        return None
+
     try:
         # Construct the API request for video details
         request = youtube_service.videos().list(
             part="snippet,contentDetails", # Request snippet and contentDetails parts
-            id=video_id                 # Specify the video ID
+            id=video_id,                # Specify the video ID
+            fields=VIDEO_DETAILS_FIELDS # Only return the fields we actually use
         )
         # Execute the request
-        response = request.execute()
+        response = request.execute(num_retries=YOUTUBE_API_RETRIES)
 
         # Check if the response contains any items (video might be deleted, private, etc.)
         if not response.get("items"):
@@ -185,21 +245,8 @@ def get_video_details(youtube_service, video_id):
             return None
 
         # Extract data from the first (and only) item in the response
-        video_item = response["items"][0]
-        snippet = video_item.get("snippet", {})           # Safely get snippet dict
-        content_details = video_item.get("contentDetails", {}) # Safely get contentDetails dict
-
-        # Assemble the dictionary of details we care about
-        details = {
-            "title": snippet.get("title", "No Title Provided"),
-            "description": snippet.get("description", ""),
-            "publishedAt": snippet.get("publishedAt"), # ISO 8601 format timestamp (string)
-            "channelTitle": snippet.get("channelTitle", "Unknown Channel"),
-            "channelId": snippet.get("channelId"),       # Added based on previous request
-            "duration": content_details.get("duration"), # ISO 8601 duration format (string, e.g., "PT11M58S")
-            "videoId": video_id,                     # Include the ID itself for convenience
-            "videoUrl": f"https://www.youtube.com/watch?v={video_id}" # Standard watch URL
-        }
+        details = _build_video_details(response["items"][0], video_id)
+        metadata_cache.put_video_details({video_id: details})
         logging.info(f"Successfully fetched details for video '{details['title']}' ({video_id}).")
         print(f"Successfully fetched details for '{details['title']}'.") # User feedback
         return details
@@ -214,6 +261,149 @@ def get_video_details(youtube_service, video_id):
         print(f"An unexpected error occurred while fetching video details: {e}")
         return None
 
+def _video_details_request(youtube_service, batch_ids):
+    """Builds (without executing) the `videos.list` request for up to VIDEOS_LIST_MAX_IDS IDs."""
+    return youtube_service.videos().list(
+        part="snippet,contentDetails",
+        id=",".join(batch_ids),
+        maxResults=VIDEOS_LIST_MAX_IDS,
+        fields=VIDEO_DETAILS_FIELDS
+    )
+
+def _parse_video_details_response(response):
+    """Turns a `videos.list` response into {video_id: details}; unavailable videos are simply missing."""
+    fetched = {}
+    for video_item in response.get("items", []):
+        video_id = video_item.get("id")
+        if video_id:
+            fetched[video_id] = _build_video_details(video_item, video_id)
+    return fetched
+
+def _fetch_video_details_chunk(youtube_service, batch_ids):
+    """
+    Requests details for up to VIDEOS_LIST_MAX_IDS videos in one `videos.list` call.
+    The caller reserves the quota. HttpError is left to the caller.
+
+    Returns:
+        dict[str, dict]: Maps video ID to its details dictionary; unavailable videos are missing.
+    """
+    return _parse_video_details_response(_video_details_request(youtube_service, batch_ids).execute(num_retries=YOUTUBE_API_RETRIES))
+
+def _fetch_video_details_chunks(youtube_service, chunks):
+    """
+    Runs one `videos.list` call per chunk of IDs. Several chunks are packed into a single
+    HTTP batch request (one multipart POST), so they share one round trip.
+
+    Returns:
+        list[tuple[list[str], dict | Exception]]: Each chunk with its details dict, or the error it raised.
+    """
+    if len(chunks) > 1:
+        results = {}
+        def collect(request_id, response, exception):
+            results[int(request_id)] = exception if exception is not None else _parse_video_details_response(response)
+        try:
+            batch = youtube_service.new_batch_http_request(callback=collect)
+            for index, batch_ids in enumerate(chunks):
+                batch.add(_video_details_request(youtube_service, batch_ids), request_id=str(index))
+            batch.execute()
+            outcomes = []
+            for index, batch_ids in enumerate(chunks):
+                result = results.get(index, RuntimeError("no response in HTTP batch"))
+                if isinstance(result, HttpError) and (result.resp.status == 429 or result.resp.status >= 500):
+                    # BatchHttpRequest has no retries of its own; resend a transiently failed part alone.
+                    try:
+                        result = _fetch_video_details_chunk(youtube_service, batch_ids)
+                    except Exception as e:
+                        result = e
+                outcomes.append((batch_ids, result))
+            return outcomes
+        except Exception as e:
+            # The quota is already reserved per chunk, so fall back to one request per chunk.
+            logging.warning(f"HTTP batch request for {len(chunks)} video detail chunks failed ({e}). Sending them one by one.")
+
+    outcomes = []
+    for batch_ids in chunks:
+        try:
+            outcomes.append((batch_ids, _fetch_video_details_chunk(youtube_service, batch_ids)))
+        except Exception as e:
+            outcomes.append((batch_ids, e))
+    return outcomes
+
+def _fetch_video_details_individually(youtube_service, video_ids):
+    """Fetches details one ID per request, so an invalid ID only loses itself. Returns {video_id: details}."""
+    fetched = {}
+    for video_id in video_ids:
+        if not quota_utils.reserve("videos.list"):
+            print("YouTube API quota exhausted. Remaining video details were not fetched.")
+            break
+        try:
+            fetched.update(_fetch_video_details_chunk(youtube_service, [video_id]))
+        except HttpError as e:
+            logging.error(f"YouTube API HTTP error {e.resp.status} fetching video details ({video_id}): {e.content}")
+        except Exception as e:
+            logging.error(f"Unexpected error fetching video details ({video_id}): {e}", exc_info=True)
+    metadata_cache.put_video_details(fetched)
+    return fetched
+
+def get_video_details_batch(youtube_service, video_ids):
+    """
+    Fetches detailed metadata for many videos, up to 50 IDs per `videos.list` request.
+
+    A batched request costs the same single quota unit as a one-video request, so this
+    collapses N requests into ceil(N / 50), which in turn travel together in one HTTP batch.
+
+    Args:
+        youtube_service (googleapiclient.discovery.Resource): The initialized YouTube service object.
+        video_ids (list[str]): The IDs of the target YouTube videos.
+
+    Returns:
+        dict[str, dict]: Maps video ID to its details dictionary (same shape as get_video_details).
+                         Videos that are private, deleted, or in a failed batch are missing from the dict.
+    """
+    if not youtube_service:
+        logging.error("get_video_details_batch called with an invalid YouTube service object.")
+        return {}
+
+    # Metadata cached by earlier runs is reused; only the rest costs API calls.
+    video_ids = list(dict.fromkeys(video_ids)) # A video added to a playlist twice is fetched once
+    details_by_id = metadata_cache.get_video_details(video_ids)
+    ids_to_fetch = [video_id for video_id in video_ids if video_id not in details_by_id]
+    if details_by_id:
+        logging.info(f"Using cached details for {len(details_by_id)} of {len(video_ids)} videos.")
+    logging.info(f"Fetching details for {len(ids_to_fetch)} videos in batches of {VIDEOS_LIST_MAX_IDS}...")
+    print(f"Fetching details for {len(ids_to_fetch)} videos...") # User feedback
+
+    # Reserve quota per videos.list call up front; whatever fits today is sent in HTTP batches.
+    chunks = []
+    for start in range(0, len(ids_to_fetch), VIDEOS_LIST_MAX_IDS):
+        if not quota_utils.reserve("videos.list"):
+            print("YouTube API quota exhausted. Remaining video details were not fetched.")
+            break
+        chunks.append(ids_to_fetch[start:start + VIDEOS_LIST_MAX_IDS])
+
+    for group_start in range(0, len(chunks), HTTP_BATCH_MAX_REQUESTS):
+        for batch_ids, result in _fetch_video_details_chunks(youtube_service, chunks[group_start:group_start + HTTP_BATCH_MAX_REQUESTS]):
+            if isinstance(result, HttpError):
+                if result.resp.status == 400 and len(batch_ids) > 1:
+                    # A single malformed ID rejects the whole request; retry one ID at a time so the rest still load.
+                    logging.warning(f"Video details batch starting at {batch_ids[0]} was rejected (400). Retrying its {len(batch_ids)} IDs one by one.")
+                    details_by_id.update(_fetch_video_details_individually(youtube_service, batch_ids))
+                    continue
+                logging.error(f"YouTube API HTTP error {result.resp.status} fetching video details batch starting at {batch_ids[0]}: {result.content}", exc_info=result)
+                print(f"Error fetching video details batch: YouTube API Error {result.resp.status}.")
+            elif isinstance(result, Exception):
+                logging.error(f"Unexpected error fetching video details batch starting at {batch_ids[0]}: {result}", exc_info=result)
+                print(f"An unexpected error occurred while fetching video details: {result}")
+            else:
+                details_by_id.update(result)
+                metadata_cache.put_video_details(result)
+
+    missing_count = len(set(video_ids) - details_by_id.keys())
+    if missing_count:
+        logging.warning(f"Video details missing for {missing_count} of {len(video_ids)} videos (maybe private or deleted?).")
+    logging.info(f"Fetched details for {len(details_by_id)} videos.")
+    return details_by_id
+
 def get_playlist_details(youtube_service, playlist_id):
     """
     Fetches details for a specific playlist, primarily its title.
@@ -235,20 +425,32 @@ def get_playlist_details(youtube_service, playlist_id):
         logging.error("get_playlist_details called with no playlist_id.")
         return None
 
+    cached_details = metadata_cache.get_playlist_details(playlist_id)
+    if cached_details:
+        logging.info(f"Using cached details for playlist ID {playlist_id}. Title: '{cached_details['title']}'")
+        return cached_details
+
     logging.info(f"Fetching details for playlist ID: {playlist_id}...")
+    if not quota_utils.reserve("playlists.list"):
+        print(f"YouTube API quota exhausted. Could not fetch details for playlist ID '{playlist_id}'.")
+        return None
+
     try:
         request = youtube_service.playlists().list(
             part="snippet",  # 'snippet' contains title, description, etc.
             id=playlist_id,
-            maxResults=1 # We only expect one playlist for a given ID
+            maxResults=1, # We only expect one playlist for a given ID
+            fields=PLAYLIST_DETAILS_FIELDS # Only the title is used
         )
-        response = request.execute()
+        response = request.execute(num_retries=YOUTUBE_API_RETRIES)
 
         if response.get("items"):
             playlist_data = response["items"][0].get("snippet", {})
             playlist_title = playlist_data.get("title", "Unnamed Playlist") # Default if title somehow missing
             logging.info(f"Successfully fetched details for playlist ID {playlist_id}. Title: '{playlist_title}'")
-            return {"title": playlist_title, "id": playlist_id}
+            playlist_details = {"title": playlist_title, "id": playlist_id}
+            metadata_cache.put_playlist_details(playlist_id, playlist_details)
+            return playlist_details
         else:
             logging.warning(f"No details found for playlist ID {playlist_id} (playlist might be empty, private, or deleted).")
             # Return a dictionary with a placeholder title so the main script can still proceed